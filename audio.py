@@ -0,0 +1,151 @@
+import os
+import time
+
+import numpy as np
+import pygame
+
+from profiler import PhaseStats
+
+# Sound effect classes: file, voices (reserved channels) and volume. Names
+# match the simulation's events, so an event plays the effect of its name
+EFFECTS = {
+    "flap": {"file": "flap.wav", "voices": 3, "volume": 0.8},
+    "point": {"file": "point.wav", "voices": 2, "volume": 1.0},
+    "hit": {"file": "hit.wav", "voices": 1, "volume": 1.0}
+}
+
+
+class AudioEngine:
+    """Sound effects played with as little delay as the device allows
+
+    The mixer is opened with a small buffer (256 samples, about 6 ms at
+    44.1 kHz, where pygame's default is 512) and every effect is decoded
+    into memory up front, with its leading silence cut off, so play() only
+    starts a channel. Each effect class owns `voices` reserved channels
+    that nothing else plays on: when all of them are busy the voice that
+    started first is cut off and restarted, so rapid flaps never wait for a
+    free channel and never take one from a hit or point sound.
+
+    play() takes the perf_counter() time of the input that caused the sound.
+    The time from there to the channel starting, plus the buffer's playback
+    delay, is added to the effect's latency stats and passed to every
+    callable in hooks as hook(name, ms).
+    """
+
+    FREQUENCY = 44100
+    BUFFER = 256  # samples
+    SILENCE = 0.01  # fraction of full scale below which leading samples are cut
+
+    def __init__(self, effects=EFFECTS, buffer=BUFFER, frequency=FREQUENCY, directory="."):
+        self.effects = effects
+        self.buffer = buffer
+        self.frequency = frequency
+        self.directory = directory
+        self.sounds = {}
+        self.voices = {}  # effect -> its reserved channels
+        self.started = {}  # effect -> perf_counter() each voice last started
+        self.stolen = dict.fromkeys(effects, 0)
+        self.latency = {name: PhaseStats(120) for name in effects}
+        self.hooks = []
+        self.output_ms = 0.0
+        self.ready = False
+        # Applies to the mixer.init() in open(), which may run on another thread
+        pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+    def open(self):
+        """Open the device and decode every effect; False if there is no audio"""
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return False
+        frequency = pygame.mixer.get_init()[0]
+        self.output_ms = self.buffer / frequency * 1000
+
+        sounds = {}
+        for name, effect in self.effects.items():
+            path = os.path.join(self.directory, effect["file"])
+            if os.path.exists(path):
+                sound = trim_silence(pygame.mixer.Sound(path), self.SILENCE)
+                sound.set_volume(effect["volume"])
+                sounds[name] = sound
+
+        # Reserved channels come first; the rest stay free for Sound.play()
+        reserved = sum(effect["voices"] for effect in self.effects.values())
+        pygame.mixer.set_num_channels(max(reserved + 2, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(reserved)
+        index = 0
+        for name, effect in self.effects.items():
+            self.voices[name] = [pygame.mixer.Channel(index + voice) for voice in range(effect["voices"])]
+            self.started[name] = [0.0] * effect["voices"]
+            index += effect["voices"]
+        self.sounds = sounds
+        self.ready = True
+        return True
+
+    def play(self, name, input_at=None):
+        """Start an effect on a free voice of its class, or on the oldest one"""
+        sound = self.sounds.get(name) if self.ready else None
+        if sound is None:
+            return None
+        voices, started = self.voices[name], self.started[name]
+        for index, channel in enumerate(voices):
+            if not channel.get_busy():
+                break
+        else:
+            index = started.index(min(started))
+            channel = voices[index]
+            self.stolen[name] += 1
+        channel.play(sound)
+        now = time.perf_counter()
+        started[index] = now
+        if input_at is not None:
+            ms = (now - input_at) * 1000 + self.output_ms
+            self.latency[name].add(ms)
+            for hook in self.hooks:
+                hook(name, ms)
+        return channel
+
+    def summary(self):
+        """Overlay lines: latency percentiles of effects played from input"""
+        lines = []
+        for name, stats in self.latency.items():
+            if stats.count:
+                p50, p95, p99 = stats.percentiles()
+                lines.append(f"sound {name:<11}{p50:6.2f}{p95:6.2f}{p99:6.2f}")
+        return lines
+
+    def report(self):
+        """Device settings, voice steals and input-to-sound latency per effect"""
+        report = {"ready": self.ready, "buffer_samples": self.buffer, "output_ms": self.output_ms,
+                  "effects": {}}
+        for name in self.effects:
+            stats = self.latency[name]
+            p50, p95, p99 = stats.percentiles()
+            report["effects"][name] = {
+                "loaded": name in self.sounds,
+                "stolen": self.stolen[name],
+                "played_from_input": stats.count,
+                "latency_p50_ms": p50,
+                "latency_p95_ms": p95,
+                "latency_p99_ms": p99,
+                "latency_max_ms": stats.max_ms
+            }
+        return report
+
+
+def trim_silence(sound, threshold):
+    """sound without the near-silent samples it starts with"""
+    samples = pygame.sndarray.array(sound)
+    if samples.dtype.kind in "iu":
+        info = np.iinfo(samples.dtype)
+        level = np.abs(samples.astype(np.int64) - (info.max + info.min + 1) // 2)
+        threshold *= info.max
+    else:
+        level = np.abs(samples)
+    if level.ndim > 1:
+        level = level.max(axis=1)
+    loud = np.flatnonzero(level > threshold)
+    if len(loud) == 0 or loud[0] == 0:
+        return sound
+    return pygame.sndarray.make_sound(np.ascontiguousarray(samples[loud[0]:]))
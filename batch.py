@@ -0,0 +1,279 @@
+import math
+
+import numpy as np
+
+from levels import CURVES
+from simulation import (Simulation, DRONE_STATS, DRONES, GAMEPLAY_DEFAULTS, POWER_UP_TYPES,
+                        weather_gameplay)
+from wind import WindField, wind_field
+
+POWER_UP_NAMES = list(POWER_UP_TYPES.keys())
+SHIELD = POWER_UP_NAMES.index("shield")
+SLOW_TIME = POWER_UP_NAMES.index("slow_time")
+DOUBLE_POINTS = POWER_UP_NAMES.index("double_points")
+
+
+class BatchSimulation:
+    """N independent FlightForge games stepped together with NumPy
+
+    Follows the same rules as Simulation, but keeps every game in
+    struct-of-arrays buffers so gravity, wind, gusts, scrolling, collisions
+    and scoring run as array operations over the whole batch. Obstacle sets
+    are built from the same difficulty curve, indexed by obstacle number.
+    Obstacle sets and power-ups live in ring-buffer slots per game, as many
+    as can be on screen at once with the tuned scroll speed and spawn rate,
+    each set holding up to MAX_SEGMENTS segments. Randomness comes from a
+    seeded NumPy generator and obstacles are not checked for passability,
+    so a batch is reproducible but does not replay the exact courses of a
+    scalar Simulation with the same seed.
+    """
+
+    WIDTH, HEIGHT = Simulation.WIDTH, Simulation.HEIGHT
+    TICK_MS = Simulation.TICK_MS
+    DRONE_RADIUS = Simulation.DRONE_RADIUS
+    OBSTACLE_WIDTH = Simulation.OBSTACLE_WIDTH
+    POWER_UP_RADIUS = Simulation.POWER_UP_RADIUS
+    MAX_SEGMENTS = 4
+
+    def __init__(self, n, seed=None, drones=None, weather=None, tuning=None, curve="classic"):
+        self.n = n
+        self.tuning = tuning
+        self.curve = CURVES[curve]
+        self.curve_table = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+        self.rng = np.random.default_rng(seed)
+        # Gust offsets come from their own stream, so a seed's courses do not depend on the weather
+        self.wind_rng = np.random.default_rng(None if seed is None else [seed, 1])
+        self.gust_offset = np.zeros(n, dtype=np.int64)
+
+        # Drone profile per game, cycling through all profiles by default
+        if drones is None:
+            drones = [DRONES[i % len(DRONES)] for i in range(n)]
+        elif isinstance(drones, str):
+            drones = [drones] * n
+        self.drone_index = np.array([DRONES.index(d) for d in drones], dtype=np.int8)
+        self.gravity = np.array([DRONE_STATS[d]["gravity"] for d in DRONES])[self.drone_index]
+        self.flap_strength = np.array([DRONE_STATS[d]["flap"] for d in DRONES],
+                                      dtype=np.float64)[self.drone_index]
+        self.durations = np.array([POWER_UP_TYPES[p]["duration"] for p in POWER_UP_NAMES],
+                                  dtype=np.float64)
+
+        self.apply_weather(weather)
+
+        k, s = self.max_obstacles, self.MAX_SEGMENTS
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.time_ms = np.zeros(n)
+        self.course_time = np.zeros(n)
+        self.last_obstacle_time = np.zeros(n)
+        self.drone_x = np.zeros(n)
+        self.drone_y = np.zeros(n)
+        self.drone_vel_y = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # Obstacle slots: one x per set, gap_y per segment
+        self.spawned = np.zeros(n, dtype=np.int64)  # obstacles so far, the curve's index
+        self.next_slot = np.zeros(n, dtype=np.int64)
+        self.obstacle_x = np.zeros((n, k))
+        self.obstacle_active = np.zeros((n, k), dtype=bool)
+        self.gap_y = np.zeros((n, k, s))
+        self.segment_valid = np.zeros((n, k, s), dtype=bool)
+        self.passed = np.zeros((n, k, s), dtype=bool)
+
+        # Power-ups share the obstacle slot they spawned with
+        self.power_up_x = np.zeros((n, k))
+        self.power_up_y = np.zeros((n, k))
+        self.power_up_type = np.zeros((n, k), dtype=np.int64)
+        self.power_up_active = np.zeros((n, k), dtype=bool)
+
+        # End time (ms) of each active power-up, 0 when inactive
+        self.power_up_until = np.zeros((n, len(POWER_UP_NAMES)))
+
+        self._segment_index = np.arange(s)
+        self.reset()
+
+    def apply_weather(self, weather_conditions):
+        """Apply the gameplay side of the weather to every game in the batch"""
+        params = weather_gameplay(weather_conditions, self.tuning)
+        self.SCROLL_SPEED = params["SCROLL_SPEED"]
+        self.OBSTACLE_GAP = params["OBSTACLE_GAP"]
+        self.OBSTACLE_FREQUENCY = params["OBSTACLE_FREQUENCY"]
+        self.wind_force = params["wind_force"]
+        self.gravity_scale = params["GRAVITY"] / GAMEPLAY_DEFAULTS["GRAVITY"]
+        self.flap_scale = params["FLAP_STRENGTH"] / GAMEPLAY_DEFAULTS["FLAP_STRENGTH"]
+        self.weather_conditions = weather_conditions
+
+        # An obstacle lives from x = WIDTH until it passes x = -50, and slow
+        # time slows spawning as much as scrolling, so this many are ever live
+        spacing = self.SCROLL_SPEED * self.OBSTACLE_FREQUENCY / self.TICK_MS
+        slots = math.ceil((self.WIDTH + 50) / spacing) + 1
+        if hasattr(self, "obstacle_x") and slots > self.max_obstacles:
+            raise ValueError(f"weather needs {slots} obstacle slots, the batch has {self.max_obstacles}")
+        self.max_obstacles = getattr(self, "max_obstacles", slots)
+
+        # Gust tables are shared with Simulation; these are views, not copies
+        self.gusts = wind_field(params["gust_force"], params["gust_lift"], params["gust_ticks"])
+        if self.gusts:
+            self.gust_x = np.frombuffer(self.gusts.x)
+            self.gust_y = np.frombuffer(self.gusts.y)
+
+    def reset(self, mask=None):
+        """Reset the games selected by a boolean mask (all games by default)"""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+
+        self.tick[mask] = 0
+        self.gust_offset[mask] = self.wind_rng.integers(WindField.PERIOD, size=np.count_nonzero(mask))
+        self.time_ms[mask] = 0
+        self.course_time[mask] = 0
+        self.last_obstacle_time[mask] = 0
+        self.drone_x[mask] = 100
+        self.drone_y[mask] = self.HEIGHT // 2
+        self.drone_vel_y[mask] = 0
+        self.score[mask] = 0
+        self.game_over[mask] = False
+        self.spawned[mask] = 0
+        self.next_slot[mask] = 0
+        self.obstacle_active[mask] = False
+        self.segment_valid[mask] = False
+        self.passed[mask] = False
+        self.power_up_active[mask] = False
+        self.power_up_until[mask] = 0
+
+    def step(self, actions=None):
+        """Advance every running game by one tick
+
+        actions is a boolean array of flaps (or None for no flaps). Finished
+        games are frozen until reset(). Returns the game_over array.
+        """
+        alive = ~self.game_over
+        if actions is not None:
+            flap = alive & np.asarray(actions, dtype=bool)
+            self.drone_vel_y[flap] = self.flap_strength[flap] * self.flap_scale
+
+        self.tick += alive
+        self.time_ms += alive * self.TICK_MS
+
+        # Apply physics, wind and the slow time effect
+        self.drone_vel_y += self.gravity * (alive * self.gravity_scale)
+        self.drone_x += self.wind_force * alive
+        if self.gusts:
+            band = np.clip((self.drone_y * WindField.BANDS / self.HEIGHT).astype(np.int64),
+                           0, WindField.BANDS - 1)
+            i = band * WindField.PERIOD + (self.tick + self.gust_offset) % WindField.PERIOD
+            self.drone_x += self.gust_x[i] * alive
+            self.drone_vel_y += self.gust_y[i] * alive
+        time_factor = np.where(self.power_up_until[:, SLOW_TIME] > 0, 0.5, 1.0)
+        motion = time_factor * alive
+        self.drone_y += self.drone_vel_y * motion
+
+        # Spawn obstacles (and maybe power-ups) for games whose course timer elapsed
+        self.course_time += self.TICK_MS * motion
+        due = alive & (self.course_time - self.last_obstacle_time > self.OBSTACLE_FREQUENCY)
+        if due.any():
+            self._spawn(np.flatnonzero(due))
+
+        # Move obstacles and power-ups, retiring ones that left the screen
+        scroll = (self.SCROLL_SPEED * motion)[:, None]
+        self.obstacle_x -= scroll
+        self.obstacle_active &= self.obstacle_x > -50
+        self.power_up_x -= scroll
+        self.power_up_active &= self.power_up_x >= -20
+
+        self._check_collisions(alive)
+        self._update_score(alive)
+
+        # Expire power-ups
+        self.power_up_until[self.power_up_until < self.time_ms[:, None]] = 0
+
+        # Keep drones within bounds
+        np.clip(self.drone_x, 0, self.WIDTH, out=self.drone_x)
+
+        return self.game_over
+
+    def _spawn(self, games):
+        """Spawn an obstacle set, and with 20% chance a power-up, for each game"""
+        count = len(games)
+        slot = self.next_slot[games]
+        if self.obstacle_active[games, slot].any():
+            raise RuntimeError("obstacle slots exhausted: a live obstacle would be overwritten")
+        self.next_slot[games] = (slot + 1) % self.max_obstacles
+        self.last_obstacle_time[games] = self.course_time[games]
+
+        # The difficulty curve picks segments, jitter and power-up chance by obstacle index
+        index = self.spawned[games]
+        self.spawned[games] = index + 1
+        segments, jitter, power_up_chance = self._curve_params(index)
+        gap_y = self.rng.integers(100, self.HEIGHT - 100 - self.OBSTACLE_GAP, count, endpoint=True)
+        segment_gap_y = gap_y[:, None] + self.rng.integers(-jitter[:, None], jitter[:, None],
+                                                           (count, self.MAX_SEGMENTS), endpoint=True)
+        np.clip(segment_gap_y, 50, self.HEIGHT - 50 - self.OBSTACLE_GAP, out=segment_gap_y)
+
+        self.obstacle_x[games, slot] = self.WIDTH
+        self.obstacle_active[games, slot] = True
+        self.gap_y[games, slot] = segment_gap_y
+        self.segment_valid[games, slot] = self._segment_index < segments[:, None]
+        self.passed[games, slot] = False
+
+        spawn_power_up = self.rng.random(count) < power_up_chance
+        types = self.rng.integers(0, len(POWER_UP_NAMES), count)
+        ys = self.rng.integers(50, self.HEIGHT - 50, count, endpoint=True)
+        games, slot = games[spawn_power_up], slot[spawn_power_up]
+        self.power_up_x[games, slot] = self.WIDTH
+        self.power_up_y[games, slot] = ys[spawn_power_up]
+        self.power_up_type[games, slot] = types[spawn_power_up]
+        self.power_up_active[games, slot] = True
+
+    def _curve_params(self, index):
+        """Segments, jitter and power-up chance of the curve at each obstacle index"""
+        segments, jitter, chance = self.curve_table
+        top = int(index.max()) + 1
+        if top > len(segments):
+            rows = [self.curve(i) for i in range(max(top, 2 * len(segments), 64))]
+            segments = np.array([row["segments"] for row in rows], dtype=np.int64)
+            jitter = np.array([row["jitter"] for row in rows], dtype=np.int64)
+            chance = np.array([row["power_up_chance"] for row in rows])
+            self.curve_table = segments, jitter, chance
+        return segments[index], jitter[index], chance[index]
+
+    def _check_collisions(self, alive):
+        """Vectorized bounds, obstacle and power-up collision checks"""
+        has_shield = self.power_up_until[:, SHIELD] > 0
+        r = self.DRONE_RADIUS
+        x, y = self.drone_x[:, None], self.drone_y[:, None]
+
+        # Check if drones hit the ceiling or floor
+        out_of_bounds = (self.drone_y <= 0) | (self.drone_y >= self.HEIGHT)
+
+        # Obstacle rects overlapping each drone's x-span, then the gap test
+        # per segment (same overlap rule as pygame.Rect.colliderect)
+        overlap_x = (self.obstacle_active & (x + r > self.obstacle_x)
+                     & (x - r < self.obstacle_x + self.OBSTACLE_WIDTH))
+        y = y[:, :, None]
+        outside_gap = (y - r < self.gap_y) | (y + r > self.gap_y + self.OBSTACLE_GAP)
+        hit_obstacle = (overlap_x[:, :, None] & self.segment_valid & outside_gap).any(axis=(1, 2))
+
+        crashed = alive & ~has_shield & (out_of_bounds | hit_obstacle)
+        self.game_over |= crashed
+
+        # Remove shield after blocking one hit
+        self.power_up_until[alive & has_shield & hit_obstacle, SHIELD] = 0
+
+        # Check power-up pickups with squared distances
+        dx = x - self.power_up_x
+        dy = self.drone_y[:, None] - self.power_up_y
+        reach = self.POWER_UP_RADIUS + r
+        picked = alive[:, None] & self.power_up_active & (dx * dx + dy * dy < reach * reach)
+        if picked.any():
+            games, slots = np.nonzero(picked)
+            types = self.power_up_type[games, slots]
+            self.power_up_active[games, slots] = False
+            self.power_up_until[games, types] = self.time_ms[games] + self.durations[types]
+
+    def _update_score(self, alive):
+        """Score every segment the drone has just passed"""
+        passing = self.drone_x[:, None] > self.obstacle_x + self.OBSTACLE_WIDTH
+        newly_passed = (self.segment_valid & ~self.passed
+                        & (alive[:, None] & self.obstacle_active & passing)[:, :, None])
+        self.passed |= newly_passed
+        multiplier = np.where(self.power_up_until[:, DOUBLE_POINTS] > 0, 2, 1)
+        self.score += newly_passed.sum(axis=(1, 2)) * multiplier
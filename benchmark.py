@@ -0,0 +1,325 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# The render path runs pygame without a window or sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from simulation import Simulation, POWER_UP_TYPES
+from bots import GapBot
+from profiler import AllocationMonitor, FrameProfiler, PhaseStats, HISTOGRAM_EDGES_MS
+from weather import FixedWeather
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+CLEAR = {"temperature": 20, "wind_speed": 5, "weather_code": 0}
+THUNDERSTORM = {"temperature": 20, "wind_speed": 5, "weather_code": 95}
+
+
+def power_up_storm(sim):
+    """Add a power-up every tenth tick, keeping ~25 on screen at once"""
+    if sim.tick % 10 == 0:
+        sim.spawn_power_up(sim.rng.choice(list(POWER_UP_TYPES)), sim.rng.randint(50, sim.HEIGHT - 50))
+
+
+# Scripted worst cases: weather, course difficulty curve, length in seconds of
+# play and a per-tick hook. The hard curve gives every obstacle four segments.
+SCENARIOS = {
+    "thunderstorm": {"weather": THUNDERSTORM, "curve": "classic", "seconds": 120, "hook": None},
+    "max_segments": {"weather": CLEAR, "curve": "hard", "seconds": 120, "hook": None},
+    "power_ups": {"weather": CLEAR, "curve": "classic", "seconds": 120, "hook": power_up_storm},
+    "long_session": {"weather": THUNDERSTORM, "curve": "classic", "seconds": 30 * 60, "hook": None}
+}
+
+PATHS = ["sim", "render"]
+
+# Starts the game in a fresh interpreter, so imports are timed too, and
+# prints the StartupTimer report once the first menu frame is presented
+STARTUP_SCRIPT = """
+import json
+import main
+import pygame
+from weather import FixedWeather
+game = main.FlightForge(weather_provider=FixedWeather(), replay_dir=None, leaderboard_path=None)
+game.draw_menu()
+pygame.display.flip()
+game.startup.finish()
+print(json.dumps(game.startup.report()))
+"""
+
+STARTUP_TARGET_MS = 150  # warm start, process launch to first menu frame
+
+# Metrics where a larger value is worse, checked against --tolerance. p99 and
+# max are reported but not gated, they are too noisy on shared machines.
+# Collections are gated too: any against a baseline of none is a regression.
+REGRESSION_METRICS = ["p95_ms", "peak_traced_kb", "gc_collections"]
+
+
+def run_sim(scenario, ticks, seed, stats=None, monitor=None):
+    """Step a headless Simulation, timing only Simulation.step()"""
+    hook = SCENARIOS[scenario]["hook"]
+    sim = Simulation(seed=seed, weather=SCENARIOS[scenario]["weather"], curve=SCENARIOS[scenario]["curve"])
+    player = GapBot()
+    perf = time.perf_counter_ns
+    scores = []
+    for _ in range(ticks):
+        if hook:
+            hook(sim)
+        action = player(sim)
+        if monitor:
+            monitor.begin_frame()
+        start = perf()
+        sim.step(action)
+        if stats:
+            stats.add((perf() - start) / 1e6)
+        if monitor:
+            monitor.end_frame()
+        if sim.game_over:
+            # Crashes restart straight away, like a player pressing space
+            scores.append(sim.score)
+            sim.reset()
+    return {"games": len(scores) + 1, "scores": scores}
+
+
+def run_render(scenario, ticks, seed, stats=None, monitor=None):
+    """Draw one frame per sim tick, timing particles, drawing and the flip"""
+    import main  # pygame is only needed for the render path
+
+    hook = SCENARIOS[scenario]["hook"]
+    game = main.FlightForge(seed=seed, weather_provider=FixedWeather(SCENARIOS[scenario]["weather"]),
+                            replay_dir=None, leaderboard_path=None, curve=SCENARIOS[scenario]["curve"])
+    game.profiler = FrameProfiler(window=ticks)
+    game.sim.profiler = None  # step() is timed by the sim path
+    game.show_menu = False
+    sim = game.sim
+    player = GapBot()
+    perf = time.perf_counter_ns
+    for _ in range(ticks):
+        if hook:
+            hook(sim)
+        sim.step(player(sim))
+        if sim.game_over:
+            game.reset_game()
+
+        if monitor:
+            monitor.begin_frame()
+        start = perf()
+        game.profiler.begin_frame()
+        game.update_particles()
+        game.profiler.mark("update_particles")
+        game.draw_frame()
+        game.profiler.end_frame()
+        if stats:
+            stats.add((perf() - start) / 1e6)
+        if monitor:
+            monitor.end_frame()
+
+    phases = {name: {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+              for name, p50, p95, p99 in game.profiler.summary() if name != "frame"}
+    return {"phases": phases, "particles": len(game.particles)}
+
+
+def run_case(case):
+    """Benchmark one scenario on one path in a fresh worker process
+
+    The timed pass runs untraced; an identical second pass under tracemalloc
+    measures peak Python heap, objects kept per tick and garbage
+    collections, so tracing never skews the timings.
+    """
+    scenario, path, seed, scale = case
+    ticks = max(1, int(SCENARIOS[scenario]["seconds"] * scale * Simulation.TICK_RATE))
+    run = run_sim if path == "sim" else run_render
+
+    stats = PhaseStats(ticks)
+    extra = run(scenario, ticks, seed, stats)
+    peak_rss_kb = None
+    if resource:
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss_kb //= 1024  # macOS reports bytes
+
+    monitor = AllocationMonitor(window=ticks, report_limit=0)
+    tracemalloc.start()
+    run(scenario, ticks, seed, monitor=monitor)
+    peak_traced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    monitor.close()
+
+    p50, p95, p99 = stats.percentiles((50, 95, 99))
+    result = {
+        "scenario": scenario,
+        "path": path,
+        "ticks": ticks,
+        "ticks_per_sec": ticks / (stats.total_ms / 1000) if stats.total_ms else 0.0,
+        "mean_ms": stats.total_ms / ticks,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "max_ms": stats.max_ms,
+        "histogram": stats.histogram,
+        "peak_traced_kb": peak_traced / 1024,
+        "peak_rss_kb": peak_rss_kb,
+        "objects_per_tick": monitor.objects.total / ticks,
+        "gc_collections": sum(monitor.collections),
+        "gc_pause_max_ms": monitor.pauses.max_ms
+    }
+    if "scores" in extra:
+        scores = extra.pop("scores")
+        extra["mean_score"] = sum(scores) / len(scores) if scores else None
+    result.update(extra)
+    return result
+
+
+def measure_startup(runs):
+    """Time-to-first-menu-frame over several launches
+
+    Launches run in an empty working directory, so the first one resolves
+    fonts from scratch (cold) and the rest reuse its font cache (warm).
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=root, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    reports = []
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], capture_output=True,
+                                    text=True, check=True, cwd=cwd, env=env).stdout
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    warm = sorted(reports[1:] or reports, key=lambda report: report["total_ms"])
+    median = warm[len(warm) // 2]
+    return {
+        "runs": runs,
+        "cold_ms": reports[0]["total_ms"],
+        "warm_p50_ms": median["total_ms"],
+        "warm_min_ms": warm[0]["total_ms"],
+        "target_ms": STARTUP_TARGET_MS,
+        "phases": median["phases"]
+    }
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(seed, scale):
+    """Machine and build details stored with the results"""
+    import numpy
+    import pygame
+    return {
+        "commit": git_commit(),
+        "created": time.time(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "seed": seed,
+        "scale": scale,
+        "histogram_edges_ms": HISTOGRAM_EDGES_MS
+    }
+
+
+def compare(baseline, report, tolerance):
+    """Print current vs baseline per case and return the regressed cases"""
+    regressions = []
+    for key, result in report["results"].items():
+        old = baseline["results"].get(key)
+        if old is None or old["ticks"] != result["ticks"]:
+            print(f"{key}: no comparable baseline")
+            continue
+
+        changes = {"ticks_per_sec": result["ticks_per_sec"] / old["ticks_per_sec"] - 1}
+        for metric in REGRESSION_METRICS:
+            if old.get(metric):
+                changes[metric] = result[metric] / old[metric] - 1
+            elif metric in old and result[metric]:
+                changes[metric] = float("inf")
+
+        # Throughput regresses when it drops, everything else when it grows
+        worse = [metric for metric, change in changes.items()
+                 if (-change if metric == "ticks_per_sec" else change) > tolerance]
+        label = ", ".join(f"{metric} {change:+.1%}" for metric, change in changes.items())
+        print(f"{key}: {label}" + (f"  REGRESSED: {', '.join(worse)}" if worse else ""))
+        if worse:
+            regressions.append(key)
+
+    startup, old = report.get("startup"), baseline.get("startup")
+    if startup and old:
+        change = startup["warm_p50_ms"] / old["warm_p50_ms"] - 1
+        regressed = change > tolerance
+        print(f"startup: warm_p50_ms {change:+.1%}" + ("  REGRESSED" if regressed else ""))
+        if regressed:
+            regressions.append("startup")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless FlightForge benchmark suite")
+    parser.add_argument("--out", default="benchmark.json", help="JSON results file")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every scenario's length (0.1 for a quick run)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="comma-separated scenario names")
+    parser.add_argument("--paths", default=",".join(PATHS), help="sim, render or both")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="game launches timed to the first menu frame (0 to skip)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown or growth counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    paths = [path for path in args.paths.split(",") if path]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+    for path in paths:
+        if path not in PATHS:
+            parser.error(f"unknown path {path!r}, choose from {', '.join(PATHS)}")
+
+    report = {"environment": environment(args.seed, args.scale), "results": {}}
+    if args.startup_runs:
+        startup = report["startup"] = measure_startup(args.startup_runs)
+        print(f"startup: {startup['warm_p50_ms']:.0f} ms warm (target {STARTUP_TARGET_MS} ms), "
+              f"{startup['cold_ms']:.0f} ms cold")
+    cases = [(name, path, args.seed, args.scale) for name in scenarios for path in paths]
+
+    # One case at a time, each in a fresh process so peak RSS is per case
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_case, cases):
+            key = f"{result['scenario']}/{result['path']}"
+            report["results"][key] = result
+            print(f"{key}: {result['ticks_per_sec']:,.0f} ticks/s, p50 {result['p50_ms']:.3f} ms, "
+                  f"p95 {result['p95_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+                  f"peak {result['peak_traced_kb']:,.0f} KiB traced, {result['gc_collections']} collections")
+
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
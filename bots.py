@@ -0,0 +1,121 @@
+import time
+
+# Players for driving a headless Simulation: any callable taking the
+# Simulation and returning True to flap on the next tick
+
+
+class ScriptedPlayer:
+    """Flap on a fixed tick interval, ignoring the course"""
+
+    def __init__(self, interval=24):
+        self.interval = interval
+
+    def __call__(self, sim):
+        return sim.tick % self.interval == 0
+
+
+class GapBot:
+    """Flap whenever the drone is falling below the next gap's target line
+
+    aim is where in the gap to fly, as a fraction from the top edge.
+    """
+
+    def __init__(self, aim=0.65):
+        self.aim = aim
+
+    def __call__(self, sim):
+        target = sim.HEIGHT / 2
+        reach = sim.drone_x - sim.DRONE_RADIUS
+        for obstacle in sim.obstacles:
+            if obstacle.x + obstacle.width > reach:
+                target = obstacle.gap_ys[0] + sim.OBSTACLE_GAP * self.aim
+                break
+        return sim.drone_y > target and sim.drone_vel_y > 0
+
+
+class BeamPilot:
+    """Autopilot that plans with beam search over the Simulation itself
+
+    Every `hold` ticks it searches moves of `hold` ticks each (flap then
+    coast, or just coast) from the current state. It keeps the `width`
+    best surviving states per level, down to `depth` moves or until
+    budget_ms runs out, then makes the first move of the best line. States
+    are stepped for real and rewound with Simulation.snapshot()/restore(),
+    so the search sees the exact course, weather and power-ups. A line is
+    valued by score, then by how close the drone is to the middle of the
+    next gap.
+    """
+
+    def __init__(self, width=6, depth=24, hold=4, budget_ms=8.0):
+        self.width = width
+        self.depth = depth
+        self.hold = hold
+        self.budget_ms = budget_ms
+        self.last_depth = 0  # levels searched by the latest plan, for tuning the budget
+
+    def __call__(self, sim):
+        if sim.tick % self.hold:
+            return False  # coasting through the current move
+        return self.plan(sim)
+
+    def value(self, sim):
+        target = sim.HEIGHT / 2
+        reach = sim.drone_x - sim.DRONE_RADIUS
+        for obstacle in sim.obstacles:
+            if obstacle.x + obstacle.width > reach:
+                target = (obstacle.gap_top + obstacle.gap_bottom) / 2
+                break
+        return sim.score * 1000 - abs(sim.drone_y - target)
+
+    def plan(self, sim):
+        """Search from the current state and return whether to flap now"""
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        hold, width = self.hold, self.width
+        step = sim.step
+
+        # Search moves must not reach the replay or the profiler
+        recorder, profiler = sim.recorder, sim.profiler
+        sim.recorder = sim.profiler = None
+        root = sim.snapshot()
+        beam = [(root, None)]
+        best = False
+        self.last_depth = 0
+        try:
+            for depth in range(self.depth):
+                children = []
+                for state, first in beam:
+                    for flap in (True, False):
+                        sim.restore(state)
+                        step(flap)
+                        for _ in range(hold - 1):
+                            step()
+                        if sim.game_over:
+                            continue
+                        children.append((self.value(sim), sim.snapshot(),
+                                         flap if first is None else first))
+                if not children:
+                    break  # every line crashes: go with the deepest survivor
+                children.sort(key=lambda child: child[0], reverse=True)
+                beam = [(state, first) for value, state, first in children[:width]]
+                best = children[0][2]
+                self.last_depth = depth + 1
+                if time.perf_counter() > deadline:
+                    break
+        finally:
+            sim.restore(root)
+            sim.recorder, sim.profiler = recorder, profiler
+        return best
+
+
+PLAYERS = {
+    "scripted": ScriptedPlayer,
+    "bot": GapBot,
+    "beam": BeamPilot
+}
+
+
+def play(sim, player, max_ticks=None):
+    """Run one game to completion (or max_ticks) and return the final score"""
+    while not sim.game_over and (max_ticks is None or sim.tick < max_ticks):
+        sim.step(player(sim))
+    return sim.score
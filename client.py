@@ -0,0 +1,137 @@
+import argparse
+import socket
+
+import pygame
+
+from fonts import FontCache
+from levels import CURVES
+from protocol import (FLAP, JOIN, JOIN_PAYLOAD, RESTART, RESTART_PAYLOAD, STATE, WELCOME,
+                      WELCOME_PAYLOAD, FrameReader, StateMirror, frame)
+from simulation import DRONE_STATS, DRONES, POWER_UP_TYPES, Simulation
+from sprites import SpriteAtlas
+from text_cache import TextCache
+
+
+class ThinClient:
+    """Renders a server session and sends it the player's flaps
+
+    The server runs the game; the client only mirrors the latest STATE and
+    draws it. Space flaps, or starts a new game after a crash.
+    """
+
+    BG_COLOR = (135, 206, 235)
+    OBSTACLE_COLOR = (0, 128, 0)
+
+    def __init__(self, address, seed=0, drone="Standard", curve="classic"):
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.connect(address)
+        self.socket.setblocking(False)
+        self.socket.sendall(frame(JOIN, JOIN_PAYLOAD.pack(seed, DRONES.index(drone),
+                                                          list(CURVES).index(curve))))
+        self.reader = FrameReader()
+        self.mirror = None
+        self.seed = None
+        self.drone = drone
+
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((Simulation.WIDTH, Simulation.HEIGHT))
+        pygame.display.set_caption("FlightForge (network)")
+        self.font = FontCache().get('Arial', 25)
+        self.text_cache = TextCache()
+        self.atlas = SpriteAtlas(lambda text, color: self.text_cache.render(self.font, text, color))
+        self.clock = pygame.time.Clock()
+
+    def receive(self):
+        """Apply every message that has arrived; False once the server hangs up"""
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except BlockingIOError:
+                return True
+            if not data:
+                return False
+            for kind, payload in self.reader.feed(data):
+                if kind == WELCOME:
+                    session_id, self.seed, drone, curve, gap = WELCOME_PAYLOAD.unpack(payload)
+                    self.mirror = StateMirror(gap)
+                    pygame.display.set_caption(f"FlightForge (session {session_id}, seed {self.seed})")
+                elif kind == STATE and self.mirror:
+                    self.mirror.apply(payload)
+
+    def send(self, kind, payload=b""):
+        self.socket.sendall(frame(kind, payload))
+
+    def draw(self):
+        screen, mirror = self.screen, self.mirror
+        screen.fill(self.BG_COLOR)
+        if mirror is None:
+            return
+
+        gap, height = mirror.OBSTACLE_GAP, mirror.HEIGHT
+        column = self.atlas.column(self.OBSTACLE_COLOR, mirror.OBSTACLE_WIDTH, height)
+        for obstacle in mirror.obstacles:
+            x = int(obstacle.x)
+            for gap_y in obstacle.gap_ys:
+                screen.blit(column, (x, 0), (0, 0, obstacle.width, gap_y))
+                screen.blit(column, (x, gap_y + gap), (0, 0, obstacle.width, height - (gap_y + gap)))
+
+        for power_up in mirror.power_ups:
+            if not power_up.collected:
+                color = POWER_UP_TYPES[power_up.type]["color"]
+                sprite, (ax, ay) = self.atlas.power_up(power_up.type, color, power_up.radius)
+                screen.blit(sprite, (int(power_up.x) - ax, power_up.y - ay))
+
+        sprite, (ax, ay) = self.atlas.drone(DRONE_STATS[self.drone]["color"],
+                                            5 + abs(mirror.drone_vel_y) * 2)
+        screen.blit(sprite, (mirror.drone_x - ax, mirror.drone_y - ay))
+
+        text = f"Score: {mirror.score}"
+        if mirror.game_over:
+            text += "  -  Game over, SPACE to fly again"
+        screen.blit(self.text_cache.render(self.font, text, (255, 255, 255)), (20, 20))
+
+    def run(self):
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_SPACE and self.mirror:
+                        if self.mirror.game_over:
+                            self.send(RESTART, RESTART_PAYLOAD.pack(0))
+                        else:
+                            self.send(FLAP)
+            if not self.receive():
+                print("Server closed the connection")
+                running = False
+            self.draw()
+            pygame.display.flip()
+            self.clock.tick(Simulation.TICK_RATE)
+        self.socket.close()
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thin client for the FlightForge server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--seed", type=int, default=0, help="course seed (0: server picks)")
+    parser.add_argument("--drone", choices=DRONES, default="Standard")
+    parser.add_argument("--curve", choices=list(CURVES), default="classic")
+    args = parser.parse_args()
+
+    address = args.unix or (args.host, args.port)
+    ThinClient(address, args.seed, args.drone, args.curve).run()
+
+
+if __name__ == "__main__":
+    main()
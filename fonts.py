@@ -0,0 +1,55 @@
+import json
+import os
+
+import pygame
+
+
+class FontCache:
+    """Fonts by family name and size, with resolved file paths cached on disk
+
+    pygame.font.SysFont() scans every installed font the first time it is
+    called (fc-list on Linux, the registry on Windows), which can take
+    hundreds of ms. Paths resolved once are saved to path, so later starts
+    open the font file directly and only fonts actually used are loaded.
+    """
+
+    def __init__(self, path="font_cache.json"):
+        self.path = path
+        self.paths = self.load()
+        self.fonts = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(self.paths, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error writing font cache: {e}")
+
+    def font_path(self, name):
+        """File for a font family, or None for pygame's default font"""
+        if name in self.paths:
+            path = self.paths[name]
+            if path is None or os.path.exists(path):
+                return path
+
+        # Slow path: scan the system fonts, then remember the answer
+        path = pygame.font.match_font(name)
+        self.paths[name] = path
+        self.save()
+        return path
+
+    def get(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(self.font_path(name), size)
+        return font
@@ -0,0 +1,207 @@
+import heapq
+import json
+import os
+import queue
+import threading
+import time
+
+
+def categories(record):
+    """Leaderboards a run counts towards: overall, its drone and its weather
+
+    Runs imported from older versions have no drone or weather and count
+    only overall.
+    """
+    if record["drone"] is None:
+        return ("all",)
+    return ("all", f"drone:{record['drone']}", f"weather:{record['weather_code']}")
+
+
+class Leaderboard:
+    """Persistent top-K leaderboards with achievements, saved off the frame thread
+
+    Runs are kept in one bounded min-heap per category, so recording a run
+    is O(log K) however many runs have been played, and the best score per
+    category is tracked separately for O(1) lookups. record_run() updates
+    memory at once and queues the run for a writer thread, which appends it
+    to a journal (path.log, one fsynced JSON line per run). Every
+    compact_every runs the writer folds the journal into an atomically
+    replaced snapshot (path.json) and truncates it. Runs carry a sequence
+    number and the snapshot records the last one it covers, so a crash
+    between the two steps never counts a run twice.
+    """
+
+    def __init__(self, path="leaderboard", top_k=100, compact_every=1000,
+                 legacy_paths=("highscore.txt", "highscore.json")):
+        self.snapshot_path = path + ".json"
+        self.log_path = path + ".log"
+        self.top_k = top_k
+        self.compact_every = compact_every
+
+        self.lock = threading.Lock()
+        self.heaps = {}  # category -> min-heap of (score, -seq, record)
+        self.best = {}  # category -> best score
+        self.achievements = {}  # achievement name -> first unlock time
+        self.runs = 0
+        self.seq = 0
+        self.log_records = 0
+        self.torn_tail = False  # journal ends mid-line after a crash
+
+        self.queue = queue.Queue()
+        self.thread = None
+
+        if not self.load():
+            self.import_legacy(legacy_paths)
+
+    def insert(self, record):
+        """Add a run to every category it belongs to (caller holds the lock)"""
+        entry = (record["score"], -record["seq"], record)
+        for category in categories(record):
+            heap = self.heaps.setdefault(category, [])
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            if record["score"] > self.best.get(category, -1):
+                self.best[category] = record["score"]
+
+    def record_run(self, score, drone, weather_code, achievements=(), replay=None):
+        """Record a finished run; disk writes happen on the writer thread"""
+        now = time.time()
+        with self.lock:
+            self.seq += 1
+            record = {
+                "seq": self.seq,
+                "score": score,
+                "drone": drone,
+                "weather_code": weather_code,
+                "time": now,
+                "achievements": list(achievements),
+                "replay": replay
+            }
+            self.insert(record)
+            for name in achievements:
+                self.achievements.setdefault(name, now)
+            self.runs += 1
+
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._writer, daemon=True)
+            self.thread.start()
+        self.queue.put(record)
+        return record
+
+    def best_score(self, category="all"):
+        return self.best.get(category, 0)
+
+    def top(self, category="all", count=10):
+        """Best runs in a category, highest score (then earliest run) first"""
+        with self.lock:
+            entries = list(self.heaps.get(category, ()))
+        return [record for score, seq, record in heapq.nlargest(count, entries)]
+
+    def load(self):
+        """Restore the snapshot and replay the journal; False if neither exists"""
+        found = False
+        last_seq = 0
+        try:
+            with open(self.snapshot_path, "r") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            pass
+        else:
+            found = True
+            last_seq = self.seq = snapshot["last_seq"]
+            self.runs = snapshot["runs"]
+            self.achievements = snapshot["achievements"]
+            for record in snapshot["records"]:
+                self.insert(record)
+
+        try:
+            with open(self.log_path, "r") as file:
+                for line in file:
+                    self.log_records += 1
+                    self.torn_tail = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a crash mid-append
+                    found = True
+                    if record["seq"] <= last_seq:
+                        continue  # already folded into the snapshot
+                    self.seq = max(self.seq, record["seq"])
+                    self.runs += 1
+                    self.insert(record)
+                    for name in record["achievements"]:
+                        self.achievements.setdefault(name, record["time"])
+        except OSError:
+            pass
+        return found
+
+    def import_legacy(self, paths):
+        """Carry over the single high score kept by older versions, on the overall board only"""
+        best = 0
+        for path in paths:
+            try:
+                with open(path, "r") as file:
+                    text = file.read()
+                value = json.loads(text)
+                if isinstance(value, dict):
+                    value = value.get("highscore", 0)
+                best = max(best, int(value))
+            except (OSError, ValueError, TypeError):
+                continue
+        if best > 0:
+            self.record_run(best, None, None)
+
+    def snapshot(self):
+        """Everything the leaderboard needs to restart (caller holds the lock)"""
+        records = {}
+        for heap in self.heaps.values():
+            for score, seq, record in heap:
+                records[record["seq"]] = record
+        return {
+            "last_seq": self.seq,
+            "runs": self.runs,
+            "achievements": dict(self.achievements),
+            "records": sorted(records.values(), key=lambda record: record["seq"])
+        }
+
+    def _writer(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            try:
+                with open(self.log_path, "a") as file:
+                    if self.torn_tail:
+                        file.write("\n")
+                        self.torn_tail = False
+                    file.write(json.dumps(record) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+                self.log_records += 1
+                if self.log_records >= self.compact_every:
+                    self.compact()
+            except OSError as e:
+                print(f"Error saving leaderboard: {e}")
+
+    def compact(self):
+        """Fold the journal into a new snapshot, replaced atomically, then truncate it"""
+        with self.lock:
+            snapshot = self.snapshot()
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        with open(self.log_path, "w"):
+            pass
+        self.log_records = 0
+        self.torn_tail = False
+
+    def close(self):
+        """Wait for queued runs to reach the disk"""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
@@ -0,0 +1,167 @@
+import random
+import threading
+
+
+# Difficulty curves map an obstacle's index along the course to how it is
+# built: segments per column, vertical jitter between segment gaps (pixels)
+# and the chance of a power-up spawning with it.
+
+def classic_curve(index):
+    """One more segment every five obstacles, up to four"""
+    return {"segments": 1 + min(index // 5, 3), "jitter": 30, "power_up_chance": 0.2}
+
+
+def easy_curve(index):
+    """At most two segments with gentle jitter and more power-ups"""
+    return {"segments": 1 + min(index // 10, 1), "jitter": 20, "power_up_chance": 0.3}
+
+
+def hard_curve(index):
+    """Four segments from the start, jitter growing until validation has to step in"""
+    return {"segments": 4, "jitter": 30 + min(index, 40), "power_up_chance": 0.1}
+
+
+CURVES = {
+    "classic": classic_curve,
+    "easy": easy_curve,
+    "hard": hard_curve
+}
+
+
+class Course:
+    """Seeded obstacle course, generated chunk by chunk ahead of the scroll
+
+    Each obstacle is (gap_ys, power_up), power_up being None or a
+    (type, y) pair. Chunks are built strictly in order, each from its own
+    RNG seeded by (seed, chunk index), so a seed, curve and drone always
+    give the same course whichever thread builds it. Every obstacle is
+    checked against the drone's physics and re-rolled (then flattened as a
+    last resort) until it is passable. With start_prefetch() a background
+    thread keeps chunks built ahead, so spawning is a list lookup.
+    """
+
+    CHUNK_SIZE = 16
+    MAX_ATTEMPTS = 8
+    MARGIN = 4  # spare pixels of clearance beyond the drone's flap arc
+
+    def __init__(self, seed, curve, physics, power_up_types):
+        self.seed = seed
+        self.curve = curve
+        self.physics = physics
+        self.power_up_types = list(power_up_types)
+
+        self.lock = threading.Condition()
+        self.chunks = {}
+        self.next_chunk = 0
+        self.last_obstacle = None  # end of the latest built chunk, for transition checks
+        self.wanted_chunk = 0
+        self.ahead = 0
+        self.thread = None
+        self.stopped = False
+
+    def required_clearance(self):
+        """Gap height the drone needs: its body plus the arc of one flap"""
+        physics = self.physics
+        arc = physics["flap"] ** 2 / (2 * physics["gravity"])
+        return 2 * physics["radius"] + arc + self.MARGIN
+
+    def passable(self, previous, gap_ys):
+        """Whether the drone can fit through gap_ys, and climb to it from previous"""
+        physics = self.physics
+        gap = physics["gap"]
+        top, bottom = max(gap_ys), min(gap_ys) + gap
+        if bottom - top < self.required_clearance():
+            return False
+        if previous is None:
+            return True
+
+        # Flapping every tick climbs at |flap| - gravity px/tick; allow half that
+        previous_gap_ys = previous[0]
+        previous_centre = (max(previous_gap_ys) + min(previous_gap_ys) + gap) / 2
+        climb = previous_centre - (top + bottom) / 2
+        max_climb = physics["spacing_ticks"] * (abs(physics["flap"]) - physics["gravity"]) / 2
+        return climb <= max_climb
+
+    def build_obstacle(self, rng, index, previous):
+        height, gap = self.physics["height"], self.physics["gap"]
+        params = self.curve(index)
+        lowest, highest = 50, height - 50 - gap
+
+        for attempt in range(self.MAX_ATTEMPTS + 1):
+            if attempt == self.MAX_ATTEMPTS:
+                # Give up on the curve for this one: a single, unjittered gap
+                segments, jitter = 1, 0
+            else:
+                segments, jitter = params["segments"], params["jitter"]
+            gap_y = rng.randint(100, height - 100 - gap)
+            gap_ys = tuple(max(lowest, min(highest, gap_y + rng.randint(-jitter, jitter)))
+                           for _ in range(segments))
+            if self.passable(previous, gap_ys):
+                break
+
+        power_up = None
+        if rng.random() < params["power_up_chance"]:
+            power_up = (rng.choice(self.power_up_types), rng.randint(50, height - 50))
+        return gap_ys, power_up
+
+    def build_next(self):
+        """Build the next chunk in order (caller holds the lock)"""
+        index = self.next_chunk
+        rng = random.Random(f"{self.seed}/{index}")
+        chunk = []
+        previous = self.last_obstacle
+        for i in range(self.CHUNK_SIZE):
+            previous = self.build_obstacle(rng, index * self.CHUNK_SIZE + i, previous)
+            chunk.append(previous)
+        self.chunks[index] = chunk
+        self.last_obstacle = previous
+        self.next_chunk += 1
+
+    def obstacle(self, n):
+        """The n-th obstacle of the course, building its chunk now if needed"""
+        index = n // self.CHUNK_SIZE
+        with self.lock:
+            if index < self.next_chunk and index not in self.chunks:
+                self.rebuild(index)
+            while index not in self.chunks:
+                self.build_next()
+            chunk = self.chunks[index]
+
+            # Spawning only moves forward, so older chunks can go
+            self.chunks.pop(index - 2, None)
+            if index != self.wanted_chunk:
+                self.wanted_chunk = index
+                self.lock.notify()
+        return chunk[n % self.CHUNK_SIZE]
+
+    def rebuild(self, index):
+        """Regenerate a chunk dropped before a rewind (caller holds the lock)
+
+        Chunks depend on the one before, so this builds the course again up
+        to index in a scratch Course.
+        """
+        scratch = Course(self.seed, self.curve, self.physics, self.power_up_types)
+        while scratch.next_chunk <= index:
+            scratch.build_next()
+            scratch.chunks.pop(scratch.next_chunk - 3, None)
+        self.chunks[index] = scratch.chunks[index]
+
+    def start_prefetch(self, ahead=2):
+        """Keep `ahead` chunks past the current one built on a background thread"""
+        self.ahead = ahead
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._prefetch, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.lock.notify()
+
+    def _prefetch(self):
+        with self.lock:
+            while not self.stopped:
+                if self.next_chunk <= self.wanted_chunk + self.ahead:
+                    self.build_next()
+                else:
+                    self.lock.wait()
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import time
+
+from bots import GapBot
+from levels import CURVES
+from profiler import PhaseStats
+from protocol import (FLAP, JOIN, JOIN_PAYLOAD, RESTART, RESTART_PAYLOAD, STATE, WELCOME,
+                      WELCOME_PAYLOAD, FrameReader, StateMirror, frame)
+from simulation import DRONES, Simulation
+
+
+class LoadClient(asyncio.Protocol):
+    """One simulated player: mirrors its session and flies it with GapBot
+
+    Games that end are restarted straight away, with one RESTART per game
+    over. Gaps between state messages go into the shared PhaseStats.
+    """
+
+    def __init__(self, drone, curve, seed, gaps):
+        self.join = frame(JOIN, JOIN_PAYLOAD.pack(seed, drone, curve))
+        self.reader = FrameReader()
+        self.player = GapBot()
+        self.gaps = gaps
+        self.mirror = None
+        self.transport = None
+        self.last_state = None
+        self.states = 0
+        self.bytes = 0
+        self.games = 0
+        self.restarting = False  # RESTART sent, new game not mirrored yet
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(self.join)
+
+    def data_received(self, data):
+        self.bytes += len(data)
+        now = time.perf_counter()
+        for kind, payload in self.reader.feed(data):
+            if kind == WELCOME:
+                self.mirror = StateMirror(WELCOME_PAYLOAD.unpack(payload)[-1])
+            elif kind == STATE:
+                if self.last_state is not None:
+                    self.gaps.add((now - self.last_state) * 1000)
+                self.last_state = now
+                self.states += 1
+                self.mirror.apply(payload)
+                if self.mirror.game_over:
+                    if not self.restarting:
+                        self.restarting = True
+                        self.games += 1
+                        self.transport.write(frame(RESTART, RESTART_PAYLOAD.pack(0)))
+                    continue
+                self.restarting = False
+                if self.player(self.mirror):
+                    self.transport.write(frame(FLAP))
+
+
+async def run(args):
+    loop = asyncio.get_running_loop()
+    gaps = PhaseStats(100000)
+    clients = []
+    for i in range(args.sessions):
+        client = LoadClient(i % len(DRONES), list(CURVES).index(args.curve), args.seed, gaps)
+        if args.unix:
+            await loop.create_unix_connection(lambda: client, args.unix)
+        else:
+            await loop.create_connection(lambda: client, args.host, args.port)
+        clients.append(client)
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.sessions)
+
+    # Measure only once every session is connected and streaming
+    await asyncio.sleep(1.0)
+    states = sum(client.states for client in clients)
+    received = sum(client.bytes for client in clients)
+    gaps = PhaseStats(100000)
+    for client in clients:
+        client.gaps = gaps
+    start = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    elapsed = time.perf_counter() - start
+    states = sum(client.states for client in clients) - states
+    received = sum(client.bytes for client in clients) - received
+
+    expected = args.sessions * Simulation.TICK_RATE / args.send_every * elapsed
+    p50, p95, p99 = gaps.percentiles((50, 95, 99))
+    print(f"{args.sessions} sessions: {states / elapsed:,.0f} states/s "
+          f"({states / expected:.1%} of the {Simulation.TICK_RATE / args.send_every:.0f} Hz target), "
+          f"{received / elapsed / 1024:,.0f} KiB/s, {received / max(states, 1):.1f} bytes/state")
+    print(f"gap between states: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+          f"max {gaps.max_ms:.1f} ms; {sum(client.games for client in clients)} games played")
+    for client in clients:
+        client.transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the FlightForge server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds to spread connections over")
+    parser.add_argument("--curve", choices=list(CURVES), default="classic")
+    parser.add_argument("--seed", type=int, default=0, help="course seed for every session (0: server picks)")
+    parser.add_argument("--send-every", type=int, default=1, help="the server's --send-every")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,450 +1,644 @@
+import time
+STARTUP_START = time.perf_counter()  # taken before pygame is imported, for startup timing
+
 import pygame
+import gc
 import random
 import sys
-import math
-import time
-import json
-import urllib.request
+import os
+import threading
 from datetime import datetime
 
+from simulation import Simulation, DRONE_STATS, DRONES, POWER_UP_TYPES, EVENT_FLAP
+from weather import WeatherProvider
+from particles import ParticlePool
+from parallax import ParallaxBackground
+from audio import AudioEngine
+from text_cache import TextCache
+from sprites import SpriteAtlas
+from render_target import DynamicResolution, RenderTarget
+from profiler import AllocationMonitor, FrameProfiler, StartupTimer
+from fonts import FontCache
+from replay import Recorder
+from leaderboard import Leaderboard
+from bots import BeamPilot
+
 class FlightForge:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, seed=None, weather_provider=None, dirty_rects=False, fps=60,
+                 profile_path=None, replay_dir="replays", leaderboard_path="leaderboard",
+                 curve="classic", alloc_budget=None, alloc_trace=False, gc_freeze=False,
+                 display="window", window_size=None, render_scale=1.0, dynamic_resolution=False,
+                 smooth_upscale=True, background_layers=4, background_quality="medium",
+                 audio_buffer=AudioEngine.BUFFER):
+        # Time-to-first-menu-frame, reported in the F3 overlay and the profile export
+        self.startup = StartupTimer(STARTUP_START)
+        self.startup.mark("imports")
+        
+        # Only what the menu needs; audio opens on a background thread below
+        pygame.display.init()
+        pygame.font.init()
+        self.startup.mark("pygame_init")
+        
+        # Every run gets its own seed and is recorded to replay_dir (None disables)
+        self.seed_rng = random.Random(seed)
+        self.replay_dir = replay_dir
+        self.recorder = None
+        
+        # Scores and achievements persist in the leaderboard (None disables)
+        self.leaderboard = Leaderboard(leaderboard_path) if leaderboard_path else None
+        self.startup.mark("leaderboard")
+        
+        # Per-phase frame timing (F3 shows the overlay, profile_path gets a JSON report on exit)
+        self.profiler = FrameProfiler()
+        self.profile_path = profile_path
+        self.show_profiler = False
+        
+        # Allocation accounting for gameplay frames: alloc_budget is how many
+        # gc-tracked objects a frame may keep before it is reported
+        self.alloc_monitor = None
+        if alloc_budget is not None:
+            self.alloc_monitor = AllocationMonitor(alloc_budget, trace=alloc_trace)
         
         # Game Constants
-        self.WIDTH, self.HEIGHT = 800, 600
-        self.GRAVITY = 0.5
-        self.FLAP_STRENGTH = -8
-        self.SCROLL_SPEED = 3
-        self.OBSTACLE_GAP = 200
-        self.OBSTACLE_FREQUENCY = 1500  # milliseconds between obstacles
-        
-        # Display setup
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+        self.WIDTH, self.HEIGHT = Simulation.WIDTH, Simulation.HEIGHT
+        self.FPS = fps  # render rate cap; the simulation always ticks at Simulation.TICK_RATE
+        self.MAX_FRAME_MS = 250  # longest frame the simulation catches up on
+        self.MAX_TICKS_PER_FRAME = 256
+        self.IDLE_TIMEOUT_MS = 500  # menu/game over wake-up interval for weather polling
+        self.drawn_screen = None  # idle screen currently presented, None while playing
+        self.FAST_FORWARD_SPEED = 8
+        self.fast_forward = False
+        self.AUTOPILOT_BUDGET_MS = 8.0  # planning time per frame, shared by its decisions
+        self.autopilot = None  # BeamPilot flying the drone, toggled with A
+        
+        # Display setup. Everything is drawn in 800x600 gameplay coordinates
+        # onto a canvas render_scale times that size (self.screen), which is
+        # upscaled to the display once per frame. dynamic_resolution lowers
+        # the scale while frames miss their 1000/fps ms budget.
+        self.display = self.create_display(display, window_size)
+        self.target = RenderTarget(self.display, self.WIDTH, self.HEIGHT, render_scale, smooth_upscale)
+        self.screen = self.target.canvas
+        self.resolution = None
+        if dynamic_resolution:
+            self.resolution = DynamicResolution(1000 / fps, top=render_scale)
+        self.frame_started = time.perf_counter()
         pygame.display.set_caption("FlightForge: Atmospheric Explorer")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont('Arial', 25)
-        self.large_font = pygame.font.SysFont('Arial', 40)
-        
-        # Game state variables
+        self.startup.mark("display")
+        
+        # Menu fonts now; others (like the profiler's) load on first use
+        self.fonts = FontCache()
+        self.font = self.fonts.get('Arial', 25)
+        self.large_font = self.fonts.get('Arial', 40)
+        self.startup.mark("fonts")
+        self.text_cache = TextCache()
+        self.hud_lines = {}  # HUD slot -> (value, surface) it was last rendered for
+        self.power_up_labels = {name: name.title() + ": {:.1f}s" for name in POWER_UP_TYPES}
+        self.atlas = SpriteAtlas(lambda text, color: self.render_text(self.font, text, color))
+        
+        # Dirty-rect mode repaints and presents only the regions that changed
+        self.dirty_rects = dirty_rects
+        self.frame_rects = []
+        self.prev_rects = []
+        self.full_repaint = True
+        self.painted_bg_color = None
+        
+        # Parallax weather background (0 layers: a flat bg_color fill). Dirty-rect
+        # frames only repaint what moved, so they keep just the static sky.
+        self.background = None
+        if background_layers:
+            layers = 1 if dirty_rects else background_layers
+            self.background = ParallaxBackground(self.WIDTH, self.HEIGHT, layers, background_quality)
+        self.background_profile = "clear"
+        self.background_from = None  # profile fading out during a weather transition
+        self.background_t = 1.0
+        
+        # Pre-composed menu and game-over layers, rebuilt only when their contents change
+        self.menu_layer = None
+        self.menu_layer_key = None
+        self.game_over_layer = None
+        self.game_over_layer_key = None
+        self.game_over_background = None
+        
+        # Game state lives in the headless simulation core
+        self.sim = Simulation(seed=seed, curve=curve)
+        self.sim.profiler = self.profiler
+        self.sim.course_prefetch = 2  # build and validate the course off the frame thread
+        self.particles = ParticlePool(self.WIDTH, self.HEIGHT, seed=seed)
         self.reset_game()
+        self.startup.mark("game_state")
         
-        # Load weather data
+        # Load weather data (cached or default now, live data in the background)
+        self.WEATHER_TRANSITION_MS = 3000  # blend time when the weather changes mid-run
+        self.weather_transition = None
+        self.weather_provider = weather_provider if weather_provider is not None else WeatherProvider()
         self.weather_conditions = self.get_weather_data()
         self.apply_weather_effects()
+        self.startup.mark("weather")
         
-        # Audio setup
-        pygame.mixer.init()
-        self.sound_flap = pygame.mixer.Sound("flap.wav") if self.file_exists("flap.wav") else None
-        self.sound_hit = pygame.mixer.Sound("hit.wav") if self.file_exists("hit.wav") else None
-        self.sound_point = pygame.mixer.Sound("point.wav") if self.file_exists("point.wav") else None
+        # Audio setup: opening the device and decoding sounds happens in the
+        # background, and the game plays silently until they are ready
+        self.audio = AudioEngine(buffer=audio_buffer)
+        threading.Thread(target=self.audio.open, daemon=True).start()
         
         # Menu state
         self.show_menu = True
         self.drone_selection = 0
-        self.drones = ["Standard", "Heavy-Duty", "Agile"]
-        self.drone_stats = {
-            "Standard": {"gravity": 0.5, "flap": -8, "color": (255, 0, 0)},
-            "Heavy-Duty": {"gravity": 0.7, "flap": -10, "color": (0, 0, 255)},
-            "Agile": {"gravity": 0.4, "flap": -7, "color": (0, 255, 0)}
-        }
-        
-        # Achievement system
-        self.achievements = {
-            "First Flight": {"description": "Fly for the first time", "unlocked": False},
-            "High Flyer": {"description": "Score 10 points", "unlocked": False},
-            "Weather Navigator": {"description": "Play in special weather conditions", "unlocked": False},
-            "Master Pilot": {"description": "Score 20 points", "unlocked": False}
-        }
-        
-        # Load high score
-        self.high_score = self.load_high_score()
+        self.drones = DRONES
+        self.drone_stats = DRONE_STATS
+        
+        # Achievement system (tracked by the simulation across games)
+        self.achievements = self.sim.achievements
+        
+        # Load high score and earlier unlocked achievements
+        self.high_score = 0
+        if self.leaderboard:
+            self.high_score = self.leaderboard.best_score()
+            for name in self.leaderboard.achievements:
+                if name in self.achievements:
+                    self.achievements[name]["unlocked"] = True
+        self.startup.mark("menu_state")
+        
+        # gc_freeze moves everything alive after startup out of the collector's
+        # view and turns automatic collection off, so gameplay frames never
+        # pause for it; collect_garbage() runs it when an idle screen comes up
+        self.gc_freeze = gc_freeze
+        self.collected_on = None  # idle screen garbage was last collected on
+        if gc_freeze:
+            gc.collect()
+            gc.freeze()
+            gc.disable()
     
-    def file_exists(self, filename):
-        """Check if file exists to prevent errors when loading sounds"""
-        try:
-            with open(filename):
-                return True
-        except FileNotFoundError:
-            return False
+    def create_display(self, mode, window_size):
+        """Open the window: "window" is a plain one of window_size (800x600 by
+        default), "scaled" and "fullscreen" have SDL upscale 800x600 to the
+        window or screen with vsync
+        """
+        if mode in ("scaled", "fullscreen"):
+            flags = pygame.SCALED | (pygame.FULLSCREEN if mode == "fullscreen" else 0)
+            for vsync in (1, 0):
+                try:
+                    return pygame.display.set_mode((self.WIDTH, self.HEIGHT), flags, vsync=vsync)
+                except pygame.error as e:
+                    error = e
+            print(f"Scaled display unavailable ({error}), using a plain window")
+        return pygame.display.set_mode(window_size or (self.WIDTH, self.HEIGHT))
+    
+    def set_render_scale(self, scale):
+        """Switch the internal resolution; the next frame repaints everything"""
+        self.target.set_scale(scale)
+        self.screen = self.target.canvas
+        self.full_repaint = True
+        self.painted_bg_color = None
     
     def reset_game(self):
         """Reset all game state variables"""
-        self.drone_x = 100
-        self.drone_y = self.HEIGHT // 2
-        self.drone_vel_y = 0
-        self.obstacles = []
-        self.last_obstacle_time = pygame.time.get_ticks()
-        self.score = 0
-        self.game_over = False
-        self.particles = []
-        self.obstacle_passed = set()  # Track which obstacles we've passed for scoring
+        self.sim.reset(self.seed_rng.getrandbits(32))
+        self.particles.clear()
+        self.recorder = Recorder(self.sim) if self.replay_dir else None
+        self.run_saved = False
+        self.run_assisted = self.autopilot is not None  # autopilot runs stay off the leaderboard
+        self.game_over_background = None
+        self.run_weather_code = (self.sim.weather_conditions or {}).get("weather_code")
+        
+        # Fixed-timestep loop state
+        self.accumulator = 0.0
+        self.flap_pending = False
+        self.flap_sounded = False  # the pending flap's sound already played on the key press
+        self.prev_drone_x, self.prev_drone_y = self.sim.drone_x, self.sim.drone_y
+        self.render_alpha = 1.0
         
         # Power-up system
-        self.power_ups = []
-        self.active_power_ups = {}
-        self.power_up_types = {
-            "shield": {"duration": 5000, "color": (255, 215, 0)},
-            "slow_time": {"duration": 3000, "color": (0, 191, 255)},
-            "double_points": {"duration": 7000, "color": (138, 43, 226)}
-        }
+        self.power_up_types = POWER_UP_TYPES
     
     def get_weather_data(self):
-        """Attempt to fetch real-world weather data for dynamic gameplay"""
-        try:
-            # Using a free weather API - in production, use a more reliable service
-            # and your own API key
-            url = "https://api.open-meteo.com/v1/forecast?latitude=40.71&longitude=-74.01&current_weather=true"
-            response = urllib.request.urlopen(url)
-            data = json.loads(response.read().decode())
-            return {
-                "temperature": data["current_weather"]["temperature"],
-                "wind_speed": data["current_weather"]["windspeed"],
-                "weather_code": data["current_weather"]["weathercode"]
-            }
-        except Exception as e:
-            print(f"Error fetching weather data: {e}")
-            # Default weather conditions if API fails
-            return {
-                "temperature": 20,
-                "wind_speed": 5,
-                "weather_code": 0  # 0 is clear sky
+        """Return the best weather available now and start a background fetch"""
+        self.weather_provider.start()
+        return self.weather_provider.initial_conditions()
+    
+    def weather_visuals(self):
+        """Snapshot of the weather values that blend during a transition"""
+        return {
+            "bg_color": self.bg_color,
+            "background_profile": self.background_profile,
+            "obstacle_color": self.obstacle_color,
+            "particle_color": getattr(self, "particle_color", (255, 255, 255)),
+            "particle_density": self.particle_density
+        }
+    
+    def update_weather(self):
+        """Hot-apply new weather as it arrives, blending over WEATHER_TRANSITION_MS"""
+        conditions = self.weather_provider.poll()
+        if conditions:
+            start = self.weather_visuals()
+            self.weather_conditions = conditions
+            self.apply_weather_effects(self.WEATHER_TRANSITION_MS)
+            self.weather_transition = {
+                "start_time": time.perf_counter() * 1000,
+                "from": start,
+                "to": self.weather_visuals()
             }
+        
+        if self.weather_transition:
+            transition = self.weather_transition
+            t = (time.perf_counter() * 1000 - transition["start_time"]) / self.WEATHER_TRANSITION_MS
+            t = min(max(t, 0.0), 1.0)
+            start, end = transition["from"], transition["to"]
+            
+            def lerp(a, b):
+                return a + (b - a) * t
+            
+            self.bg_color = tuple(int(lerp(a, b)) for a, b in zip(start["bg_color"], end["bg_color"]))
+            self.obstacle_color = tuple(int(lerp(a, b)) for a, b in
+                                        zip(start["obstacle_color"], end["obstacle_color"]))
+            self.particle_density = lerp(start["particle_density"], end["particle_density"])
+            self.particle_color = end["particle_color"] if end["particle_density"] else start["particle_color"]
+            self.background_from = start["background_profile"]
+            self.background_t = t
+            
+            if t >= 1.0:
+                self.weather_transition = None
+                self.background_from = None
     
-    def apply_weather_effects(self):
+    def apply_weather_effects(self, transition_ms=0):
         """Apply weather effects to gameplay based on real-world data"""
+        # Gameplay effects (wind, gravity, flap, spawn rate) live in the simulation,
+        # which blends the wind over sim ticks so replays reproduce it exactly
+        self.sim.apply_weather(self.weather_conditions, round(transition_ms / Simulation.TICK_MS))
+        
         if self.weather_conditions:
-            # Wind effects based on real wind speed
-            self.wind_force = (self.weather_conditions["wind_speed"] - 5) * 0.05
-            
             # Visual effects based on weather code
             code = self.weather_conditions["weather_code"]
             
             # Clear sky (0-1)
             if code <= 1:
                 self.bg_color = (135, 206, 235)  # Sky blue
+                self.background_profile = "clear"
                 self.obstacle_color = (34, 139, 34)  # Forest green
                 self.has_particles = False
             
             # Cloudy (2-3)
             elif code <= 3:
                 self.bg_color = (200, 200, 200)  # Gray
+                self.background_profile = "cloudy"
                 self.obstacle_color = (105, 105, 105)  # Dim gray
                 self.has_particles = False
             
             # Foggy/Misty (45-48)
             elif code in [45, 48]:
                 self.bg_color = (220, 220, 220)  # Light gray
+                self.background_profile = "fog"
                 self.obstacle_color = (169, 169, 169)  # Dark gray
                 self.has_particles = True
                 self.particle_color = (255, 255, 255)  # White mist
-                # Reduce visibility by increasing obstacle frequency
-                self.OBSTACLE_FREQUENCY = 1200
+                self.particle_density = 0.3
             
             # Rainy (51-67)
             elif 51 <= code <= 67:
                 self.bg_color = (105, 105, 105)  # Dim gray
+                self.background_profile = "rain"
                 self.obstacle_color = (47, 79, 79)  # Dark slate gray
                 self.has_particles = True
                 self.particle_color = (184, 184, 184)  # Light gray rain
-                # Make gameplay harder with reduced flap strength
-                self.FLAP_STRENGTH = -7.5
+                self.particle_density = 4
             
             # Snowy (71-77)
             elif 71 <= code <= 77:
                 self.bg_color = (240, 248, 255)  # Alice blue
+                self.background_profile = "snow"
                 self.obstacle_color = (176, 196, 222)  # Light steel blue
                 self.has_particles = True
                 self.particle_color = (255, 250, 250)  # Snow
-                # Make control more slippery
-                self.GRAVITY = 0.45
+                self.particle_density = 2
             
             # Thunderstorm (80-99)
             elif code >= 80:
                 self.bg_color = (47, 79, 79)  # Dark slate gray
+                self.background_profile = "storm"
                 self.obstacle_color = (25, 25, 112)  # Midnight blue
                 self.has_particles = True
                 self.particle_color = (255, 255, 0)  # Yellow lightning
-                # Make gameplay unpredictable with wind gusts
-                self.FLAP_STRENGTH = -8.5
-                
-            # Mark weather navigation achievement
-            if code != 0:
-                self.achievements["Weather Navigator"]["unlocked"] = True
+                self.particle_density = 8
         else:
             # Default settings if no weather data
-            self.wind_force = 0
             self.bg_color = (135, 206, 235)  # Sky blue
+            self.background_profile = "clear"
             self.obstacle_color = (34, 139, 34)  # Forest green
             self.has_particles = False
-    
-    def spawn_obstacle(self):
-        """Create a new obstacle with varying height and gap position"""
-        gap_y = random.randint(100, self.HEIGHT - 100 - self.OBSTACLE_GAP)
-        
-        # Create more complex obstacles as score increases
-        complexity = min(self.score // 5, 3)
-        segments = 1 + complexity
         
-        obstacle_parts = []
+        # Weather without particles spawns none (density is new particles per frame)
+        if not self.has_particles:
+            self.particle_density = 0
         
-        for i in range(segments):
-            segment_gap_y = gap_y + random.randint(-30, 30)
-            segment_gap_y = max(50, min(self.HEIGHT - 50 - self.OBSTACLE_GAP, segment_gap_y))
-            
-            obstacle_parts.append({
-                "x": self.WIDTH,
-                "gap_y": segment_gap_y,
-                "width": 50,
-                "passed": False
-            })
-        
-        self.obstacles.append(obstacle_parts)
-    
-    def spawn_power_up(self):
-        """Spawn a random power-up"""
-        if random.random() < 0.2:  # 20% chance to spawn a power-up
-            power_up_type = random.choice(list(self.power_up_types.keys()))
-            self.power_ups.append({
-                "type": power_up_type,
-                "x": self.WIDTH,
-                "y": random.randint(50, self.HEIGHT - 50),
-                "radius": 15,
-                "collected": False
-            })
+        # Render the weather's sky layers off the frame thread, at every
+        # canvas size dynamic resolution may switch to
+        if self.background:
+            scales = self.resolution.scales if self.resolution else (self.target.scale,)
+            self.background.prepare(self.background_profile,
+                                    [self.target.canvas_size(scale) for scale in scales])
+    
+    def blit(self, surface, position, area=None):
+        """Blit onto the screen, recording the rect for dirty-rect updates"""
+        rect = self.target.blit(surface, position, area)
+        if self.dirty_rects:
+            self.frame_rects.append(rect)
+    
+    def interpolated_drone(self):
+        """Drone position blended between the last two sim ticks"""
+        alpha = self.render_alpha
+        x = self.prev_drone_x + (self.sim.drone_x - self.prev_drone_x) * alpha
+        y = self.prev_drone_y + (self.sim.drone_y - self.prev_drone_y) * alpha
+        return int(x), int(y)
+    
+    def scroll_offset(self):
+        """How far behind the latest tick the course is drawn when interpolating"""
+        return self.sim.last_scroll * (1.0 - self.render_alpha)
+    
+    def advance_simulation(self, frame_ms):
+        """Run as many fixed sim ticks as the elapsed frame time calls for"""
+        speed = self.FAST_FORWARD_SPEED if self.fast_forward else 1
+        self.accumulator += min(frame_ms, self.MAX_FRAME_MS) * speed
+        
+        if self.autopilot:
+            # Share the frame's planning budget between the decisions due this frame
+            due = int(self.accumulator // Simulation.TICK_MS)
+            self.autopilot.budget_ms = self.AUTOPILOT_BUDGET_MS / max(1, due // self.autopilot.hold)
+        
+        ticks = 0
+        while self.accumulator >= Simulation.TICK_MS and not self.sim.game_over:
+            if ticks == self.MAX_TICKS_PER_FRAME:
+                # Too far behind: drop the backlog instead of spiralling
+                self.accumulator = 0.0
+                break
+            self.prev_drone_x, self.prev_drone_y = self.sim.drone_x, self.sim.drone_y
+            flap = self.flap_pending
+            if self.autopilot:
+                flap = self.autopilot(self.sim)
+                self.profiler.mark("autopilot")
+            events = self.sim.step(flap)
+            self.flap_pending = False
+            self.play_event_sounds(events)
+            self.flap_sounded = False
+            self.profiler.mark("sounds")
+            self.accumulator -= Simulation.TICK_MS
+            ticks += 1
+        
+        self.render_alpha = min(self.accumulator / Simulation.TICK_MS, 1.0)
+        return ticks
     
     def draw_drone(self):
         """Draw the player's drone with animations based on velocity"""
         drone_color = self.drone_stats[self.drones[self.drone_selection]]["color"]
-        
-        # Base drone shape
-        pygame.draw.circle(self.screen, drone_color, (self.drone_x, self.drone_y), 20)
+        x, y = self.interpolated_drone()
         
         # Propellers animation based on flapping
-        propeller_speed = abs(self.drone_vel_y) * 2
+        propeller_speed = abs(self.sim.drone_vel_y) * 2
         propeller_offset = 5 + propeller_speed
         
-        # Draw propellers
-        pygame.draw.line(self.screen, (50, 50, 50), 
-                         (self.drone_x - 15, self.drone_y - propeller_offset),
-                         (self.drone_x - 25, self.drone_y - propeller_offset), 5)
-        pygame.draw.line(self.screen, (50, 50, 50), 
-                         (self.drone_x + 15, self.drone_y - propeller_offset),
-                         (self.drone_x + 25, self.drone_y - propeller_offset), 5)
-        
-        # Draw body details
-        pygame.draw.rect(self.screen, (80, 80, 80), 
-                         (self.drone_x - 10, self.drone_y - 5, 20, 10))
+        sprite, (ax, ay) = self.atlas.drone(drone_color, propeller_offset)
+        self.blit(sprite, (x - ax, y - ay))
         
         # Draw active power-ups visual effects
-        if "shield" in self.active_power_ups:
-            pygame.draw.circle(self.screen, (255, 215, 0, 128), 
-                              (self.drone_x, self.drone_y), 25, 2)
+        if "shield" in self.sim.active_power_ups:
+            sprite, (ax, ay) = self.atlas.ring((255, 215, 0), 25, 2)
+            self.blit(sprite, (x - ax, y - ay))
         
-        if "slow_time" in self.active_power_ups:
-            pygame.draw.circle(self.screen, (0, 191, 255, 128), 
-                              (self.drone_x, self.drone_y), 30, 1)
+        if "slow_time" in self.sim.active_power_ups:
+            sprite, (ax, ay) = self.atlas.ring((0, 191, 255), 30, 1)
+            self.blit(sprite, (x - ax, y - ay))
     
     def draw_obstacles(self):
-        """Draw the obstacles"""
-        for obstacle_set in self.obstacles:
-            for obstacle in obstacle_set:
+        """Draw the obstacles from a pre-rendered column"""
+        gap = self.sim.OBSTACLE_GAP
+        column = self.atlas.column(self.obstacle_color, self.sim.OBSTACLE_WIDTH, self.HEIGHT)
+        offset = self.scroll_offset()
+        for obstacle in self.sim.obstacles:
+            x = int(obstacle.x + offset)
+            for gap_y in obstacle.gap_ys:
                 # Top obstacle
-                pygame.draw.rect(self.screen, self.obstacle_color, 
-                                (obstacle["x"], 0, obstacle["width"], obstacle["gap_y"]))
+                self.blit(column, (x, 0), (0, 0, obstacle.width, gap_y))
                 
                 # Bottom obstacle
-                pygame.draw.rect(self.screen, self.obstacle_color, 
-                                (obstacle["x"], 
-                                 obstacle["gap_y"] + self.OBSTACLE_GAP, 
-                                 obstacle["width"], 
-                                 self.HEIGHT - (obstacle["gap_y"] + self.OBSTACLE_GAP)))
+                self.blit(column, (x, gap_y + gap), (0, 0, obstacle.width, self.HEIGHT - (gap_y + gap)))
     
     def draw_power_ups(self):
         """Draw power-ups"""
-        for power_up in self.power_ups:
-            if not power_up["collected"]:
-                color = self.power_up_types[power_up["type"]]["color"]
-                pygame.draw.circle(self.screen, color, 
-                                  (power_up["x"], power_up["y"]), 
-                                  power_up["radius"])
-                
-                # Draw icon inside based on type
-                if power_up["type"] == "shield":
-                    pygame.draw.circle(self.screen, (255, 255, 255), 
-                                      (power_up["x"], power_up["y"]), 
-                                      power_up["radius"] - 5, 2)
-                elif power_up["type"] == "slow_time":
-                    # Draw clock symbol
-                    pygame.draw.circle(self.screen, (255, 255, 255), 
-                                      (power_up["x"], power_up["y"]), 
-                                      power_up["radius"] - 5, 1)
-                    pygame.draw.line(self.screen, (255, 255, 255),
-                                    (power_up["x"], power_up["y"]),
-                                    (power_up["x"] + 5, power_up["y"] - 3), 2)
-                elif power_up["type"] == "double_points":
-                    # Draw x2 symbol
-                    text = self.font.render("x2", True, (255, 255, 255))
-                    text_rect = text.get_rect(center=(power_up["x"], power_up["y"]))
-                    self.screen.blit(text, text_rect)
-    
-    def update_particles(self):
-        """Update particle effects for weather visualization"""
-        if self.has_particles:
-            # Add new particles
-            if random.random() < 0.3:
-                self.particles.append({
-                    "x": random.randint(0, self.WIDTH),
-                    "y": 0,
-                    "size": random.randint(1, 3),
-                    "speed": random.uniform(2, 5)
-                })
-            
-            # Update existing particles
-            for particle in self.particles[:]:
-                particle["y"] += particle["speed"]
-                if particle["y"] > self.HEIGHT:
-                    self.particles.remove(particle)
+        offset = self.scroll_offset()
+        for power_up in self.sim.power_ups:
+            if not power_up.collected:
+                color = self.power_up_types[power_up.type]["color"]
+                sprite, (ax, ay) = self.atlas.power_up(power_up.type, color, power_up.radius)
+                self.blit(sprite, (int(power_up.x + offset) - ax, power_up.y - ay))
+    
+    def update_particles(self, dt=1.0):
+        """Update particle effects for weather visualization, dt in sim ticks"""
+        # Add new particles
+        if self.particle_density:
+            self.particles.spawn(self.particle_density * dt)
+        
+        # Update existing particles (they drain off-screen after the weather clears)
+        self.particles.update(dt)
     
     def draw_particles(self):
         """Draw weather particles"""
-        for particle in self.particles:
-            pygame.draw.circle(self.screen, self.particle_color, 
-                              (int(particle["x"]), int(particle["y"])), 
-                              particle["size"])
+        if self.particles:
+            self.particles.draw(self.screen, self.particle_color,
+                                self.frame_rects if self.dirty_rects else None, self.target.scale)
     
     def draw_hud(self):
         """Draw heads-up display with score and active power-ups"""
         # Score display
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (20, 20))
+        score_text = self.hud_text("score", self.sim.score, "Score: {}", (255, 255, 255))
+        self.blit(score_text, (20, 20))
         
         # High score
-        high_score_text = self.font.render(f"High Score: {self.high_score}", True, (255, 255, 255))
-        self.screen.blit(high_score_text, (20, 50))
+        high_score_text = self.hud_text("high_score", self.high_score, "High Score: {}", (255, 255, 255))
+        self.blit(high_score_text, (20, 50))
         
         # Display active power-ups
         power_up_y = 80
-        for power_up, end_time in self.active_power_ups.items():
-            remaining = (end_time - pygame.time.get_ticks()) / 1000
+        for power_up, end_time in self.sim.active_power_ups.items():
+            remaining = (end_time - self.sim.time_ms) / 1000
             if remaining > 0:
-                power_text = self.font.render(f"{power_up.title()}: {remaining:.1f}s", True, 
+                power_text = self.hud_text(power_up, round(remaining, 1), self.power_up_labels[power_up],
                                            self.power_up_types[power_up]["color"])
-                self.screen.blit(power_text, (20, power_up_y))
+                self.blit(power_text, (20, power_up_y))
                 power_up_y += 30
         
+        if self.autopilot:
+            autopilot_text = self.hud_text("autopilot", None, "AUTOPILOT", (255, 255, 0))
+            self.blit(autopilot_text, (self.WIDTH // 2 - autopilot_text.get_width() // 2, 20))
+        
         # Weather info
         if self.weather_conditions:
-            weather_text = self.font.render(
-                f"Temp: {self.weather_conditions['temperature']}°C | Wind: {self.weather_conditions['wind_speed']} km/h", 
-                True, (255, 255, 255))
-            self.screen.blit(weather_text, (self.WIDTH - 350, 20))
-    
-    def check_collisions(self):
-        """Check if the drone has collided with obstacles or collected power-ups"""
-        # Skip collision detection if shield is active
-        if "shield" in self.active_power_ups:
-            has_shield = True
-        else:
-            has_shield = False
-        
-        # Check if drone hit the ceiling or floor
-        if self.drone_y <= 0 or self.drone_y >= self.HEIGHT:
-            if not has_shield:
-                self.game_over = True
-                if self.sound_hit:
-                    self.sound_hit.play()
-        
-        # Check obstacle collisions
-        drone_rect = pygame.Rect(self.drone_x - 20, self.drone_y - 20, 40, 40)
-        
-        for obstacle_set in self.obstacles:
-            for obstacle in obstacle_set:
-                # Top obstacle rect
-                top_rect = pygame.Rect(obstacle["x"], 0, 
-                                      obstacle["width"], obstacle["gap_y"])
-                
-                # Bottom obstacle rect
-                bottom_rect = pygame.Rect(obstacle["x"], 
-                                         obstacle["gap_y"] + self.OBSTACLE_GAP,
-                                         obstacle["width"], 
-                                         self.HEIGHT - (obstacle["gap_y"] + self.OBSTACLE_GAP))
-                
-                # Check for collisions
-                if drone_rect.colliderect(top_rect) or drone_rect.colliderect(bottom_rect):
-                    if not has_shield:
-                        self.game_over = True
-                        if self.sound_hit:
-                            self.sound_hit.play()
-                    else:
-                        # Remove shield after blocking one hit
-                        del self.active_power_ups["shield"]
-        
-        # Check power-up collisions
-        for power_up in self.power_ups:
-            if not power_up["collected"]:
-                # Simple distance-based collision detection
-                distance = math.sqrt((self.drone_x - power_up["x"])**2 + 
-                                    (self.drone_y - power_up["y"])**2)
-                
-                if distance < power_up["radius"] + 20:  # 20 is drone radius
-                    power_up["collected"] = True
-                    
-                    # Activate power-up
-                    power_up_type = power_up["type"]
-                    duration = self.power_up_types[power_up_type]["duration"]
-                    self.active_power_ups[power_up_type] = pygame.time.get_ticks() + duration
-    
-    def update_score(self):
-        """Update score when passing obstacles"""
-        for obstacle_set in self.obstacles:
-            for i, obstacle in enumerate(obstacle_set):
-                if not obstacle["passed"] and self.drone_x > obstacle["x"] + obstacle["width"]:
-                    obstacle["passed"] = True
-                    self.score += 1 * (2 if "double_points" in self.active_power_ups else 1)
-                    
-                    if self.sound_point:
-                        self.sound_point.play()
-                    
-                    # Unlock achievements
-                    if self.score >= 10:
-                        self.achievements["High Flyer"]["unlocked"] = True
-                    if self.score >= 20:
-                        self.achievements["Master Pilot"]["unlocked"] = True
-    
-    def check_power_up_expiry(self):
-        """Check and remove expired power-ups"""
-        current_time = pygame.time.get_ticks()
-        for power_up in list(self.active_power_ups.keys()):
-            if self.active_power_ups[power_up] < current_time:
-                del self.active_power_ups[power_up]
-    
-    def load_high_score(self):
-        """Load high score from file"""
+            weather_text = self.hud_text("weather", self.weather_conditions,
+                                         "Temp: {0[temperature]}°C | Wind: {0[wind_speed]} km/h",
+                                         (255, 255, 255))
+            self.blit(weather_text, (self.WIDTH - 350, 20))
+    
+    def hud_text(self, slot, value, template, color):
+        """HUD line for value, formatted and rendered only when value changes
+        
+        A steady HUD then builds no strings or cache keys from frame to frame.
+        """
+        cached = self.hud_lines.get(slot)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+        surface = self.render_text(self.font, template.format(value), color)
+        self.hud_lines[slot] = (value, surface)
+        return surface
+    
+    def play_event_sounds(self, events):
+        """Play sound effects for events raised by the simulation"""
+        for event in events:
+            if event == EVENT_FLAP and self.flap_sounded:
+                self.flap_sounded = False
+            else:
+                self.audio.play(event)
+    
+    def save_run(self):
+        """Record the run that just ended on the leaderboard, once per run"""
+        if self.run_saved:
+            return
+        self.run_saved = True
+        replay = self.save_replay()
+        if self.run_assisted:
+            return
+        if self.leaderboard:
+            unlocked = [name for name, data in self.achievements.items() if data["unlocked"]]
+            self.leaderboard.record_run(self.sim.score, self.sim.drone, self.run_weather_code,
+                                        unlocked, replay)
+        self.high_score = max(self.high_score, self.sim.score)
+    
+    def save_replay(self):
+        """Finish recording the run that just ended and write it to replay_dir
+
+        Returns the replay's file name, or None if nothing was saved.
+        """
+        if not self.recorder:
+            return None
+        data = self.recorder.finish()
+        self.recorder = None
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{self.sim.drone}-{self.sim.score}-{self.sim.seed:08x}.ffr"
         try:
-            with open("highscore.txt", "r") as file:
-                return int(file.read())
-        except:
-            return 0
-    
-    def save_high_score(self):
-        """Save high score to file"""
-        if self.score > self.high_score:
-            self.high_score = self.score
-            try:
-                with open("highscore.txt", "w") as file:
-                    file.write(str(self.high_score))
-            except:
-                pass
+            os.makedirs(self.replay_dir, exist_ok=True)
+            with open(os.path.join(self.replay_dir, name), "wb") as file:
+                file.write(data)
+        except OSError as e:
+            print(f"Error saving replay: {e}")
+            return None
+        return name
+    
+    def begin_frame(self):
+        """Clear the gameplay frame: everything, or just last frame's dirty rects"""
+        if self.dirty_rects and not self.full_repaint and self.painted_bg_color == self.bg_color:
+            for rect in self.prev_rects:
+                if self.background:
+                    self.background.restore(self.screen, rect, self.background_profile)
+                else:
+                    self.screen.fill(self.bg_color, rect)
+        elif self.background:
+            distance = self.sim.course_time / Simulation.TICK_MS * self.sim.SCROLL_SPEED - self.scroll_offset()
+            self.background.draw(self.screen, distance, self.background_profile,
+                                 self.background_from, self.background_t)
+            self.full_repaint = True
+        else:
+            self.screen.fill(self.bg_color)
+            self.full_repaint = True
+        self.painted_bg_color = self.bg_color
+    
+    def end_frame(self):
+        """Present the frame, updating only changed regions in dirty-rect mode
+        
+        Dirty rects are canvas regions, so an upscaled canvas always flips whole.
+        """
+        if self.dirty_rects and not self.full_repaint and self.target.direct:
+            pygame.display.update(self.prev_rects + self.frame_rects)
+        else:
+            pygame.display.flip()
+        self.full_repaint = False
+        self.prev_rects, self.frame_rects = self.frame_rects, self.prev_rects
+        self.frame_rects.clear()
+    
+    def draw_frame(self):
+        """Draw and present one gameplay frame"""
+        self.begin_frame()
+        self.profiler.mark("clear_screen")
+        
+        # Draw particles
+        self.draw_particles()
+        self.profiler.mark("draw_particles")
+        
+        # Draw game elements
+        self.draw_obstacles()
+        self.profiler.mark("draw_obstacles")
+        self.draw_power_ups()
+        self.profiler.mark("draw_power_ups")
+        self.draw_drone()
+        self.profiler.mark("draw_drone")
+        self.draw_hud()
+        self.profiler.mark("draw_hud")
+        if self.show_profiler:
+            self.draw_profiler()
+            self.profiler.mark("draw_profiler")
+        
+        # Upscale the canvas, then pick the next frame's resolution before
+        # the flip, which may wait for vsync
+        self.target.present()
+        self.profiler.mark("upscale")
+        if self.resolution:
+            scale = self.resolution.update((time.perf_counter() - self.frame_started) * 1000)
+            if scale != self.target.scale:
+                self.set_render_scale(scale)
+        
+        # Update display
+        self.end_frame()
+        self.profiler.mark("display_flip")
+    
+    def draw_profiler(self):
+        """Overlay rolling p50/p95/p99 frame-phase timings"""
+        if self.profiler.frames % 30 == 0 or not hasattr(self, "profiler_lines"):
+            self.profiler_lines = [f"{name:<17}{p50:6.2f}{p95:6.2f}{p99:6.2f}"
+                                   for name, p50, p95, p99 in self.profiler.summary()]
+            self.profiler_lines.insert(0, "phase ms          p50   p95   p99")
+            if self.startup.total_ms is not None:
+                self.profiler_lines.insert(0, f"first frame {self.startup.total_ms:.0f} ms")
+            if self.alloc_monitor:
+                self.profiler_lines.extend(self.alloc_monitor.summary())
+            self.profiler_lines.extend(self.audio.summary())
+            if self.resolution or not self.target.direct:
+                width, height = self.screen.get_size()
+                self.profiler_lines.append(f"render {width}x{height} ({self.target.scale:.2f})")
+        
+        y_pos = self.HEIGHT - 18 * len(self.profiler_lines) - 10
+        for line in self.profiler_lines:
+            text = self.render_text(self.fonts.get('Courier New', 15), line, (255, 255, 0))
+            self.blit(text, (self.WIDTH - 330, y_pos))
+            y_pos += 18
+    
+    def render_text(self, font, text, color):
+        """Render antialiased text through the LRU text cache"""
+        return self.text_cache.render(font, text, color)
     
     def draw_menu(self):
-        """Draw main menu"""
+        """Draw main menu from its cached layer"""
+        key = (self.drone_selection, self.high_score)
+        if key != self.menu_layer_key:
+            if self.menu_layer is None:
+                self.menu_layer = pygame.Surface((self.WIDTH, self.HEIGHT)).convert()
+            self.compose_menu(self.menu_layer)
+            self.target.forget(self.menu_layer)
+            self.menu_layer_key = key
+        self.target.blit(self.menu_layer, (0, 0))
+    
+    def compose_menu(self, surface):
+        """Render the full main menu onto surface"""
         # Background
-        self.screen.fill((50, 50, 50))
+        surface.fill((50, 50, 50))
         
         # Title
-        title_text = self.large_font.render("FlightForge: Atmospheric Explorer", True, (255, 255, 255))
-        self.screen.blit(title_text, (self.WIDTH//2 - title_text.get_width()//2, 100))
+        title_text = self.render_text(self.large_font, "FlightForge: Atmospheric Explorer", (255, 255, 255))
+        surface.blit(title_text, (self.WIDTH//2 - title_text.get_width()//2, 100))
         
         # Instructions
         instructions = [
@@ -459,84 +653,145 @@ class FlightForge:
         
         y_pos = 200
         for line in instructions:
-            text = self.font.render(line, True, (200, 200, 200))
-            self.screen.blit(text, (self.WIDTH//2 - text.get_width()//2, y_pos))
+            text = self.render_text(self.font, line, (200, 200, 200))
+            surface.blit(text, (self.WIDTH//2 - text.get_width()//2, y_pos))
             y_pos += 30
         
         # Drone selection
         y_pos = 400
         for i, drone in enumerate(self.drones):
             color = (255, 255, 255) if i == self.drone_selection else (100, 100, 100)
-            drone_text = self.font.render(drone, True, color)
+            drone_text = self.render_text(self.font, drone, color)
             
             # Highlight selected drone
             if i == self.drone_selection:
-                pygame.draw.rect(self.screen, (70, 70, 70), 
+                pygame.draw.rect(surface, (70, 70, 70), 
                                (self.WIDTH//2 - 100, y_pos - 5, 200, 30))
             
-            self.screen.blit(drone_text, (self.WIDTH//2 - drone_text.get_width()//2, y_pos))
+            surface.blit(drone_text, (self.WIDTH//2 - drone_text.get_width()//2, y_pos))
             y_pos += 40
         
         # Display drone stats
         selected_drone = self.drones[self.drone_selection]
-        stats_text = self.font.render(
+        stats_text = self.render_text(self.font, 
             f"Weight: {self.drone_stats[selected_drone]['gravity']:.1f} | Power: {abs(self.drone_stats[selected_drone]['flap']):.1f}", 
-            True, (200, 200, 200))
-        self.screen.blit(stats_text, (self.WIDTH//2 - stats_text.get_width()//2, y_pos))
+            (200, 200, 200))
+        surface.blit(stats_text, (self.WIDTH//2 - stats_text.get_width()//2, y_pos))
         
         # Display high score
-        high_score_text = self.font.render(f"High Score: {self.high_score}", True, (255, 215, 0))
-        self.screen.blit(high_score_text, (self.WIDTH//2 - high_score_text.get_width()//2, 550))
+        high_score_text = self.render_text(self.font, f"High Score: {self.high_score}", (255, 215, 0))
+        surface.blit(high_score_text, (self.WIDTH//2 - high_score_text.get_width()//2, 550))
     
     def draw_game_over(self):
-        """Draw game over screen with score and achievements"""
-        overlay = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        """Draw game over screen from its cached overlay layer"""
+        key = (self.sim.score, self.high_score,
+               tuple(data["unlocked"] for data in self.achievements.values()))
+        if key != self.game_over_layer_key:
+            if self.game_over_layer is None:
+                self.game_over_layer = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
+            self.compose_game_over(self.game_over_layer)
+            self.target.forget(self.game_over_layer)
+            self.game_over_layer_key = key
+        
+        # Keep the final gameplay frame so redraws don't stack the translucent overlay
+        if self.game_over_background is None:
+            self.game_over_background = self.screen.copy()
+        self.screen.blit(self.game_over_background, (0, 0))
+        self.target.blit(self.game_over_layer, (0, 0))
+    
+    def collect_garbage(self, screen):
+        """Run the collections gc_freeze holds back, once per visit to an idle screen
+        
+        Called after the screen is presented, so the pause is spent waiting
+        for input instead of delaying a frame.
+        """
+        if self.gc_freeze and self.collected_on != screen:
+            self.collected_on = screen
+            gc.collect()
+            self.profiler.mark("collect_garbage")
+    
+    def idle_screen(self):
+        """Name of the static screen being shown (menu or game over), None while playing"""
+        if self.show_menu:
+            return "menu"
+        if self.sim.game_over:
+            return "game_over"
+        return None
+    
+    def compose_game_over(self, surface):
+        """Render the translucent game over overlay with score and achievements onto surface"""
+        surface.fill((0, 0, 0, 180))
         
         # Game Over text
-        game_over_text = self.large_font.render("Game Over", True, (255, 0, 0))
-        self.screen.blit(game_over_text, (self.WIDTH//2 - game_over_text.get_width()//2, 150))
+        game_over_text = self.render_text(self.large_font, "Game Over", (255, 0, 0))
+        surface.blit(game_over_text, (self.WIDTH//2 - game_over_text.get_width()//2, 150))
         
         # Score display
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (self.WIDTH//2 - score_text.get_width()//2, 220))
+        score_text = self.render_text(self.font, f"Score: {self.sim.score}", (255, 255, 255))
+        surface.blit(score_text, (self.WIDTH//2 - score_text.get_width()//2, 220))
         
         # Check if high score was beaten
-        if self.score > self.high_score:
-            new_high_text = self.font.render("New High Score!", True, (255, 215, 0))
-            self.screen.blit(new_high_text, (self.WIDTH//2 - new_high_text.get_width()//2, 260))
+        if self.sim.score > self.high_score:
+            new_high_text = self.render_text(self.font, "New High Score!", (255, 215, 0))
+            surface.blit(new_high_text, (self.WIDTH//2 - new_high_text.get_width()//2, 260))
         
         # Show unlocked achievements
         y_pos = 300
-        achievement_title = self.font.render("Achievements:", True, (200, 200, 200))
-        self.screen.blit(achievement_title, (self.WIDTH//2 - achievement_title.get_width()//2, y_pos))
+        achievement_title = self.render_text(self.font, "Achievements:", (200, 200, 200))
+        surface.blit(achievement_title, (self.WIDTH//2 - achievement_title.get_width()//2, y_pos))
         y_pos += 30
         
         for name, data in self.achievements.items():
             color = (0, 255, 0) if data["unlocked"] else (100, 100, 100)
-            achievement_text = self.font.render(f"{name}: {data['description']}", True, color)
-            self.screen.blit(achievement_text, (self.WIDTH//2 - achievement_text.get_width()//2, y_pos))
+            achievement_text = self.render_text(self.font, f"{name}: {data['description']}", color)
+            surface.blit(achievement_text, (self.WIDTH//2 - achievement_text.get_width()//2, y_pos))
             y_pos += 30
         
         # Restart instructions
-        restart_text = self.font.render("Press SPACE to restart or ESC for menu", True, (255, 255, 255))
-        self.screen.blit(restart_text, (self.WIDTH//2 - restart_text.get_width()//2, 500))
+        restart_text = self.render_text(self.font, "Press SPACE to restart or ESC for menu", (255, 255, 255))
+        surface.blit(restart_text, (self.WIDTH//2 - restart_text.get_width()//2, 500))
     
     def run(self):
         """Main game loop"""
         running = True
         while running:
+            if self.idle_screen() and self.drawn_screen == self.idle_screen():
+                # Idle: the menu or game over screen is already presented, so
+                # sleep until input arrives, waking now and then to poll weather
+                event = pygame.event.wait(self.IDLE_TIMEOUT_MS)
+                events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+                self.clock.tick()  # restart frame timing so gameplay never sees the idle time
+                frame_ms = 0
+            else:
+                frame_ms = self.clock.tick(self.FPS)
+                events = pygame.event.get()
+            self.frame_started = time.perf_counter()
+            
+            self.profiler.begin_frame()
+            self.update_weather()
+            self.profiler.mark("update_weather")
+            
+            # Any input may change what an idle screen shows
+            if events:
+                self.drawn_screen = None
+            
             # Event handling
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 
                 elif event.type == pygame.KEYDOWN:
-                    if self.show_menu:
+                    if event.key == pygame.K_F3:
+                        self.show_profiler = not self.show_profiler
+                    
+                    elif self.show_menu:
                         if event.key == pygame.K_SPACE:
                             self.show_menu = False
+                            self.sim.drone = self.drones[self.drone_selection]
                             self.reset_game()
+                            if self.background:
+                                # Have the sky layers ready now rather than on the first frame
+                                self.background.layer_set(self.background_profile, self.screen.get_size())
                             self.achievements["First Flight"]["unlocked"] = True
                         elif event.key == pygame.K_LEFT:
                             self.drone_selection = (self.drone_selection - 1) % len(self.drones)
@@ -545,7 +800,7 @@ class FlightForge:
                         elif event.key == pygame.K_ESCAPE:
                             running = False
                     
-                    elif self.game_over:
+                    elif self.sim.game_over:
                         if event.key == pygame.K_SPACE:
                             self.reset_game()
                         elif event.key == pygame.K_ESCAPE:
@@ -553,108 +808,157 @@ class FlightForge:
                     
                     else:  # Active gameplay
                         if event.key == pygame.K_SPACE:
-                            # Apply drone-specific flap strength
-                            selected_drone = self.drones[self.drone_selection]
-                            self.drone_vel_y = self.drone_stats[selected_drone]["flap"]
-                            if self.sound_flap:
-                                self.sound_flap.play()
+                            # Flap is applied by the simulation on the next tick,
+                            # which may be a frame away; its sound plays right now
+                            if not self.flap_pending and not self.autopilot:
+                                self.flap_sounded = self.audio.play(EVENT_FLAP, self.frame_started) is not None
+                            self.flap_pending = True
+                        elif event.key == pygame.K_f:
+                            self.fast_forward = not self.fast_forward
+                        elif event.key == pygame.K_a:
+                            self.autopilot = None if self.autopilot else BeamPilot()
+                            self.run_assisted = True
                         elif event.key == pygame.K_ESCAPE:
                             self.show_menu = True
             
+            self.profiler.mark("events")
+            
+            # Idle screens are drawn once, then again only after input or a state change
+            if self.idle_screen() and self.drawn_screen == self.idle_screen():
+                continue
+            
             # Show menu if needed
             if self.show_menu:
+                self.drawn_screen = "menu"
+                self.full_repaint = True
                 self.draw_menu()
+                self.profiler.mark("draw_menu")
+                self.target.present()
                 pygame.display.flip()
-                self.clock.tick(60)
+                self.profiler.mark("display_flip")
+                self.startup.finish()
+                self.collect_garbage("menu")
+                self.profiler.end_frame()
                 continue
             
             # Game over state
-            if self.game_over:
-                self.save_high_score()
+            if self.sim.game_over:
+                self.drawn_screen = "game_over"
+                self.save_run()
+                self.full_repaint = True
                 self.draw_game_over()
+                self.profiler.mark("draw_game_over")
+                self.target.present()
                 pygame.display.flip()
-                self.clock.tick(60)
+                self.profiler.mark("display_flip")
+                self.collect_garbage("game_over")
+                self.profiler.end_frame()
                 continue
             
-            # Game physics updates
-            selected_drone = self.drones[self.drone_selection]
-            self.GRAVITY = self.drone_stats[selected_drone]["gravity"]
-            
-            # Apply physics
-            self.drone_vel_y += self.GRAVITY
-            
-            # Apply wind from weather conditions
-            self.drone_x += self.wind_force
-            
-            # Apply slow time effect
-            time_factor = 0.5 if "slow_time" in self.active_power_ups else 1.0
-            
-            # Update drone position
-            self.drone_y += self.drone_vel_y * time_factor
-            
-            # Update obstacles
-            current_time = pygame.time.get_ticks()
-            if current_time - self.last_obstacle_time > self.OBSTACLE_FREQUENCY * time_factor:
-                self.spawn_obstacle()
-                self.spawn_power_up()
-                self.last_obstacle_time = current_time
-            
-            # Move obstacles
-            for obstacle_set in self.obstacles[:]:
-                # Move each obstacle in the set
-                remove_set = True
-                for obstacle in obstacle_set:
-                    obstacle["x"] -= self.SCROLL_SPEED * time_factor
-                    if obstacle["x"] > -50:  # Still on screen
-                        remove_set = False
-                
-                # Remove obstacle set if all segments are off screen
-                if remove_set:
-                    self.obstacles.remove(obstacle_set)
-            
-            # Move power-ups
-            for power_up in self.power_ups[:]:
-                power_up["x"] -= self.SCROLL_SPEED * time_factor
-                if power_up["x"] < -20:
-                    self.power_ups.remove(power_up)
-            
-            # Check collisions
-            self.check_collisions()
-            
-            # Update score
-            self.update_score()
-            
-            # Update power-ups
-            self.check_power_up_expiry()
+            # Advance the simulation in fixed ticks, decoupled from the frame rate
+            self.drawn_screen = None
+            self.collected_on = None
+            if self.alloc_monitor:
+                self.alloc_monitor.begin_frame()
+            self.advance_simulation(frame_ms)
             
             # Update particles
-            self.update_particles()
-            
-            # Keep drone within bounds
-            if self.drone_x < 0:
-                self.drone_x = 0
-            elif self.drone_x > self.WIDTH:
-                self.drone_x = self.WIDTH
+            self.update_particles(min(frame_ms, self.MAX_FRAME_MS) / Simulation.TICK_MS)
+            self.profiler.mark("update_particles")
             
             # Drawing
-            self.screen.fill(self.bg_color)
-            
-            # Draw particles
-            self.draw_particles()
-            
-            # Draw game elements
-            self.draw_obstacles()
-            self.draw_power_ups()
-            self.draw_drone()
-            self.draw_hud()
-            
-            # Update display
-            pygame.display.flip()
-            self.clock.tick(60)
+            self.draw_frame()
+            if self.alloc_monitor:
+                self.alloc_monitor.end_frame()
+            self.profiler.end_frame()
+        
+        if self.profile_path:
+            extra = {"startup": self.startup.report(), "audio": self.audio.report()}
+            if self.alloc_monitor:
+                extra["allocations"] = self.alloc_monitor.report()
+            self.profiler.export(self.profile_path, extra)
+        if self.leaderboard:
+            self.leaderboard.close()
+        self.weather_provider.stop()
         
         pygame.quit()
         sys.exit()
 
+def main():
+    # CLI-only imports, kept out of the game's startup path
+    import argparse
+    from levels import CURVES
+    from parallax import QUALITY
+    
+    parser = argparse.ArgumentParser(description="FlightForge: fly a drone through real-world weather")
+    parser.add_argument("--seed", type=int, help="seed for the sequence of course seeds (default: random)")
+    parser.add_argument("--curve", choices=list(CURVES), default="classic", help="course difficulty curve")
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="repaint and present only the regions that changed")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-phase frame timings to this JSON file on exit")
+    parser.add_argument("--alloc-budget", type=int, metavar="OBJECTS",
+                        help="report gameplay frames that keep more objects than this")
+    parser.add_argument("--alloc-trace", action="store_true",
+                        help="with --alloc-budget, also trace allocation sites (slow)")
+    parser.add_argument("--gc-freeze", action="store_true",
+                        help="freeze startup objects and only collect garbage on idle screens")
+    parser.add_argument("--display", choices=["window", "scaled", "fullscreen"], default="window",
+                        help="scaled and fullscreen have SDL upscale 800x600 with vsync")
+    parser.add_argument("--window-size", metavar="WxH", help="plain window size, e.g. 1280x960")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="internal canvas size as a fraction of 800x600")
+    parser.add_argument("--dynamic-resolution", action="store_true",
+                        help="lower the render scale while frames miss their budget")
+    parser.add_argument("--no-smooth-upscale", action="store_true",
+                        help="upscale the canvas with nearest-neighbour scaling")
+    parser.add_argument("--background-layers", type=int, choices=range(5), default=4, metavar="0-4",
+                        help="parallax background layers (0: flat colour)")
+    parser.add_argument("--background-quality", choices=list(QUALITY), default="medium",
+                        help="background detail")
+    parser.add_argument("--audio-buffer", type=int, default=AudioEngine.BUFFER, metavar="SAMPLES",
+                        help="mixer buffer size; raise it if sound crackles")
+    parser.add_argument("--weather-locations", metavar="NAME:LAT:LON,...",
+                        help="cities to fetch weather for, e.g. London:51.51:-0.13 (default: New York)")
+    parser.add_argument("--weather-refresh", type=float, metavar="SECONDS",
+                        help="refetch the weather this often (default: once at startup)")
+    parser.add_argument("--weather-rotate", type=float, metavar="SECONDS",
+                        help="switch to the next location this often")
+    args = parser.parse_args()
+    
+    window_size = None
+    if args.window_size:
+        try:
+            window_size = tuple(int(n) for n in args.window_size.lower().split("x"))
+        except ValueError:
+            window_size = ()
+        if len(window_size) != 2:
+            parser.error(f"--window-size wants WIDTHxHEIGHT, not {args.window_size}")
+    
+    locations = []
+    for location in (args.weather_locations or "").split(","):
+        if not location:
+            continue
+        try:
+            name, lat, lon = location.rsplit(":", 2)
+            locations.append((name, float(lat), float(lon)))
+        except ValueError:
+            parser.error(f"--weather-locations wants NAME:LAT:LON, not {location}")
+    weather_provider = WeatherProvider(locations, refresh_interval=args.weather_refresh,
+                                       rotation_interval=args.weather_rotate)
+    
+    game = FlightForge(seed=args.seed, weather_provider=weather_provider, curve=args.curve,
+                       fps=args.fps, dirty_rects=args.dirty_rects,
+                       profile_path=args.profile, alloc_budget=args.alloc_budget,
+                       alloc_trace=args.alloc_trace, gc_freeze=args.gc_freeze,
+                       display=args.display, window_size=window_size, render_scale=args.render_scale,
+                       dynamic_resolution=args.dynamic_resolution,
+                       smooth_upscale=not args.no_smooth_upscale,
+                       background_layers=args.background_layers,
+                       background_quality=args.background_quality,
+                       audio_buffer=args.audio_buffer)
+    game.run()
+
 if __name__ == "__main__":
-    game = FlightForge()
-    game.run()
\ No newline at end of file
+    main()
\ No newline at end of file
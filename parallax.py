@@ -0,0 +1,279 @@
+import queue
+import random
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# Colours per weather profile: sky gradient (top, horizon), clouds, skyline,
+# and ground fog colour plus its opacity at the bottom edge (0: no fog)
+PROFILES = {
+    "clear": {"sky": ((80, 150, 225), (175, 225, 245)), "clouds": (255, 255, 255), "cover": 0.3,
+              "skyline": (95, 135, 170), "fog": ((255, 255, 255), 40)},
+    "cloudy": {"sky": ((150, 152, 160), (215, 215, 218)), "clouds": (238, 238, 240), "cover": 0.8,
+               "skyline": (120, 122, 130), "fog": ((230, 230, 230), 70)},
+    "fog": {"sky": ((195, 198, 202), (232, 232, 232)), "clouds": (246, 246, 246), "cover": 0.4,
+            "skyline": (178, 180, 184), "fog": ((245, 245, 245), 170)},
+    "rain": {"sky": ((60, 66, 78), (125, 126, 132)), "clouds": (88, 94, 106), "cover": 1.0,
+             "skyline": (62, 66, 74), "fog": ((150, 155, 160), 90)},
+    "snow": {"sky": ((190, 208, 232), (245, 250, 255)), "clouds": (250, 251, 255), "cover": 0.7,
+             "skyline": (165, 182, 205), "fog": ((255, 255, 255), 110)},
+    "storm": {"sky": ((18, 26, 38), (58, 84, 88)), "clouds": (38, 44, 62), "cover": 1.0,
+              "skyline": (16, 22, 36), "fog": ((70, 90, 95), 60)}
+}
+
+# Detail settings: soft edge steps on clouds and fog, whether layers may use
+# per-pixel alpha, and a multiplier on the number of shapes
+QUALITY = {
+    "low": {"soft_steps": 1, "alpha": False, "detail": 0.5},
+    "medium": {"soft_steps": 3, "alpha": True, "detail": 1.0},
+    "high": {"soft_steps": 6, "alpha": True, "detail": 2.0}
+}
+
+COLORKEY = (255, 0, 255)
+
+
+class ParallaxBackground:
+    """Weather sky built from pre-rendered layers scrolling at fractions of the course speed
+
+    The first `layers` of sky gradient, far clouds, distant skyline and
+    ground fog are rendered once per weather profile and canvas size and
+    kept in an LRU cache. Every layer but the static sky tiles across the
+    canvas width, so a frame costs one blit for the sky and two wrap-around
+    blits per scrolling layer, however much detail the quality setting puts
+    into them.
+
+    Rendering a layer set takes 10-20 ms, so prepare() hands it to a worker
+    thread as soon as a profile or canvas size is known to be coming. A
+    crossfade waits for its incoming profile before it starts fading.
+    """
+
+    LAYERS = [("sky", 0.0), ("clouds", 0.1), ("skyline", 0.25), ("fog", 0.5)]  # name, scroll factor
+    CACHE_SIZE = 32  # every weather profile at every dynamic resolution scale
+
+    def __init__(self, width, height, layers=4, quality="medium", seed=0):
+        self.width, self.height = width, height
+        self.layers = layers
+        self.quality = QUALITY[quality]
+        self.seed = seed
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()  # guards cache and pending, shared with the worker
+        self.pending = {}  # (profile, size) -> Event set once the worker has rendered it
+        self.queue = None  # worker's (profile, size) requests, created with the worker
+
+    def prepare(self, profile, sizes):
+        """Render a profile's layers for each canvas size on the worker thread"""
+        with self.lock:
+            keys = [(profile, size) for size in sizes
+                    if (profile, size) not in self.cache and (profile, size) not in self.pending]
+            for key in keys:
+                self.pending[key] = threading.Event()
+        if not keys:
+            return
+        if self.queue is None:
+            self.queue = queue.Queue()
+            threading.Thread(target=self.worker, daemon=True).start()
+        for key in keys:
+            self.queue.put(key)
+
+    def worker(self):
+        while True:
+            key = self.queue.get()
+            layers = self.render(*key)
+            with self.lock:
+                self.store(key, layers)
+                self.pending.pop(key).set()
+
+    def store(self, key, layers):
+        self.cache[key] = layers
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    def cached(self, profile, size):
+        """Layers of a profile for a canvas size if they are rendered, else None"""
+        key = (profile, size)
+        with self.lock:
+            layers = self.cache.get(key)
+            if layers is not None:
+                self.cache.move_to_end(key)
+        return layers
+
+    def layer_set(self, profile, size):
+        """Rendered (surface, y, scroll factor) layers of a profile for a canvas size
+
+        Waits for the worker if it is rendering them, and renders them here
+        if nobody prepared them.
+        """
+        layers = self.cached(profile, size)
+        if layers is None:
+            with self.lock:
+                event = self.pending.get((profile, size))
+            if event is not None:
+                event.wait()
+                layers = self.cached(profile, size)
+        if layers is None:
+            layers = self.render(profile, size)
+            with self.lock:
+                self.store((profile, size), layers)
+        return layers
+
+    def render(self, profile, size):
+        colors = PROFILES[profile]
+        scale = size[0] / self.width
+        rng = random.Random(f"background/{profile}/{self.seed}")
+        layers = []
+        for name, factor in self.LAYERS[:self.layers]:
+            layer = getattr(self, "render_" + name)(rng, colors, size, scale)
+            if layer is not None:
+                surface, y = layer
+                layers.append((surface, y, factor))
+        return layers
+
+    def render_sky(self, rng, colors, size, scale):
+        width, height = size
+        surface = converted(pygame.Surface(size))
+        (top_r, top_g, top_b), (bottom_r, bottom_g, bottom_b) = colors["sky"]
+        for y in range(height):
+            t = y / max(1, height - 1)
+            color = (round(top_r + (bottom_r - top_r) * t), round(top_g + (bottom_g - top_g) * t),
+                     round(top_b + (bottom_b - top_b) * t))
+            pygame.draw.line(surface, color, (0, y), (width, y))
+        return surface, 0
+
+    def render_clouds(self, rng, colors, size, scale):
+        width, height = size[0], round(size[1] * 0.4)
+        surface = self.blank((width, height))
+        quality = self.quality
+        clouds = max(1, round(colors["cover"] * 7 * quality["detail"]))
+        puffs = []  # (x, y, radius)
+        for _ in range(clouds):
+            cx, cy = rng.uniform(0, width), rng.uniform(0.2, 0.7) * height
+            for _ in range(round(4 + 3 * quality["detail"])):
+                puffs.append((cx + rng.uniform(-45, 45) * scale, cy + rng.uniform(-10, 10) * scale,
+                              rng.uniform(14, 28) * scale))
+
+        # Soft edges: every puff's faint outer halo first, solid cores last
+        steps = quality["soft_steps"] if quality["alpha"] else 1
+        opacity = 200 if quality["alpha"] else 255
+        for step in range(steps, 0, -1):
+            grow = 1 + 0.25 * (step - 1)
+            alpha = round(opacity * (steps - step + 1) / steps)
+            for x, y, radius in puffs:
+                self.wrapped_circle(surface, colors["clouds"] + (alpha,), x, y, radius * grow)
+        return surface, 0
+
+    def render_skyline(self, rng, colors, size, scale):
+        width, height = size[0], round(size[1] * 0.25)
+        surface = converted(pygame.Surface((width, height)))
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+        color = colors["skyline"]
+        lit = tuple(min(255, channel + 40) for channel in color)
+        detail = self.quality["detail"]
+        x = 0.0
+        while x < width:
+            building_width = rng.uniform(18, 55) * scale / max(1.0, detail ** 0.5)
+            building_height = rng.uniform(0.25, 1.0) * height
+            top = height - building_height
+            pygame.draw.rect(surface, color, (round(x), round(top), round(building_width) + 1, height))
+            if detail >= 1:
+                # Sparse lit windows
+                step = max(3, round(7 * scale))
+                for wy in range(round(top) + step, height - step, step):
+                    for wx in range(round(x) + 2, round(x + building_width) - 2, step):
+                        if rng.random() < 0.12 * detail:
+                            surface.fill(lit, (wx, wy, max(1, round(2 * scale)), max(1, round(2 * scale))))
+            x += building_width
+        return surface, size[1] - height
+
+    def render_fog(self, rng, colors, size, scale):
+        color, opacity = colors["fog"]
+        if not opacity or not self.quality["alpha"]:
+            return None
+        width, height = size[0], round(size[1] * 0.3)
+        surface = converted(pygame.Surface((width, height), pygame.SRCALPHA))
+        for y in range(height):
+            pygame.draw.line(surface, color + (round(opacity * (y / height) ** 1.5),), (0, y), (width, y))
+
+        # Drifting wisps, merged with a max blend so they never thin the ramp
+        wisps = round(6 * self.quality["detail"])
+        steps = self.quality["soft_steps"]
+        for _ in range(wisps):
+            wisp_width = rng.uniform(120, 260) * scale
+            wisp_height = rng.uniform(18, 40) * scale
+            x, y = rng.uniform(0, width), rng.uniform(0.2, 0.8) * height
+            wisp = pygame.Surface((round(wisp_width), round(wisp_height)), pygame.SRCALPHA)
+            for step in range(steps, 0, -1):
+                inset = (step - 1) / steps / 2
+                alpha = round(opacity * 0.8 * (steps - step + 1) / steps)
+                pygame.draw.ellipse(wisp, color + (alpha,), (wisp_width * inset / 2, wisp_height * inset,
+                                                             wisp_width * (1 - inset), wisp_height * (1 - 2 * inset)))
+            for offset in (-width, 0, width):
+                surface.blit(wisp, (x - wisp_width / 2 + offset, y - wisp_height / 2),
+                             special_flags=pygame.BLEND_RGBA_MAX)
+        return surface, size[1] - height
+
+    def blank(self, size):
+        """Transparent layer: per-pixel alpha, or a colour key at low quality"""
+        if self.quality["alpha"]:
+            surface = converted(pygame.Surface(size, pygame.SRCALPHA))
+            surface.fill((0, 0, 0, 0))
+            return surface
+        surface = converted(pygame.Surface(size))
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+        return surface
+
+    def wrapped_circle(self, surface, color, x, y, radius):
+        """Circle that wraps around the left and right edges, so the layer tiles"""
+        width = surface.get_width()
+        for offset in (-width, 0, width):
+            if -radius <= x + offset <= width + radius:
+                pygame.draw.circle(surface, color if self.quality["alpha"] else color[:3],
+                                   (x + offset, y), radius)
+
+    def draw(self, surface, distance, profile, fade_from=None, t=1.0):
+        """Draw the background for a course scrolled distance px (gameplay units)
+
+        During a weather transition the fade_from profile is drawn first and
+        profile faded in over it by t, once the worker has rendered it.
+        """
+        size = surface.get_size()
+        distance *= size[0] / self.width
+        if fade_from is not None and fade_from != profile and t < 1.0:
+            self.draw_layers(surface, self.layer_set(fade_from, size), distance)
+            layers = self.cached(profile, size)
+            if layers is not None:
+                self.draw_layers(surface, layers, distance, round(255 * t))
+        else:
+            self.draw_layers(surface, self.layer_set(profile, size), distance)
+
+    def draw_layers(self, surface, layers, distance, alpha=None):
+        for layer, y, factor in layers:
+            if alpha is not None:
+                previous = layer.get_alpha()
+                layer.set_alpha(alpha)
+            if factor:
+                width = layer.get_width()
+                x = -int(distance * factor % width)
+                surface.blit(layer, (x, y))
+                surface.blit(layer, (x + width, y))
+            else:
+                surface.blit(layer, (0, y))
+            if alpha is not None:
+                layer.set_alpha(previous)
+
+    def restore(self, surface, rect, profile):
+        """Repaint one region from the static sky, for dirty-rect clears"""
+        layers = self.layer_set(profile, surface.get_size())
+        surface.blit(layers[0][0], rect, rect)
+
+
+def converted(surface):
+    """surface in the display's pixel format for fast blits, once there is a display"""
+    if not pygame.display.get_surface():
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
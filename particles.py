@@ -0,0 +1,115 @@
+import numpy as np
+import pygame
+
+
+class ParticlePool:
+    """Fixed-capacity weather particle pool backed by NumPy arrays
+
+    Live particles are packed into the first `count` slots of each buffer.
+    Updates are vectorized, dead particles are recycled by swapping the
+    tail of the pool into their slots, and drawing blits pre-rendered
+    sprites (one per size and colour) in a single batched call.
+    """
+
+    MIN_SIZE, MAX_SIZE = 1, 3
+    MIN_SPEED, MAX_SPEED = 2, 5
+
+    def __init__(self, width, height, capacity=4096, seed=None):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.seed = seed
+        self.rng = None  # created on first spawn; numpy.random is slow to load at startup
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int64)
+        self.draw_x = np.zeros(capacity, dtype=np.int64)  # sprite corners, reused every draw
+        self.draw_y = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, density):
+        """Emit on average `density` new particles along the top edge"""
+        if self.rng is None:
+            self.rng = np.random.default_rng(self.seed)
+        count = int(density + self.rng.random())
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+
+        new = slice(self.count, self.count + count)
+        self.x[new] = self.rng.integers(0, self.width, count, endpoint=True)
+        self.y[new] = 0
+        self.size[new] = self.rng.integers(self.MIN_SIZE, self.MAX_SIZE, count, endpoint=True)
+        self.speed[new] = self.rng.uniform(self.MIN_SPEED, self.MAX_SPEED, count)
+        self.count += count
+
+    def update(self, dt=1.0):
+        """Move every live particle dt ticks and recycle the ones that left the screen"""
+        live = slice(0, self.count)
+        self.y[live] += self.speed[live] * dt
+
+        dead = np.flatnonzero(self.y[live] > self.height)
+        if len(dead) == 0:
+            return
+
+        # Swap-remove: fill dead slots with surviving particles from the tail
+        new_count = self.count - len(dead)
+        holes = dead[dead < new_count]
+        tail = np.arange(new_count, self.count)
+        movers = tail[self.y[tail] <= self.height]
+        for buffer in (self.x, self.y, self.speed, self.size):
+            buffer[holes] = buffer[movers]
+        self.count = new_count
+
+    def sprite_set(self, color, scale=1.0):
+        """Pre-rendered, colour-keyed particle sprites and their radii, indexed by size"""
+        entry = self.sprites.get((color, scale))
+        if entry is None:
+            key = (255, 0, 255) if color == (0, 0, 0) else (0, 0, 0)
+            sprites, radii = [None], [0]
+            for size in range(1, self.MAX_SIZE + 1):
+                radius = max(1, round(size * scale))
+                sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+                if pygame.display.get_surface():
+                    sprite = sprite.convert()
+                sprite.fill(key)
+                pygame.draw.circle(sprite, color, (radius, radius), radius)
+                sprite.set_colorkey(key)
+                sprites.append(sprite)
+                radii.append(radius)
+            entry = self.sprites[(color, scale)] = (sprites, np.array(radii))
+        return entry
+
+    def draw(self, surface, color, dirty=None, scale=1.0):
+        """Blit every live particle with one batched call
+
+        The blit sequence is streamed from zip() instead of built as a list:
+        zip reuses its result tuple once blits() lets go of it, so drawing
+        thousands of particles allocates no per-particle tuples and never
+        pushes the garbage collector over its threshold. Positions and
+        sprites are multiplied by scale, for a surface drawn at a lower
+        resolution. If a dirty list is given, the blitted rects are appended
+        to it.
+        """
+        if not self.count:
+            return
+        sprites, radii = self.sprite_set(color, scale)
+        live = slice(0, self.count)
+        size = self.size[live]
+        radius = radii[size]
+        draw_x, draw_y = self.draw_x[live], self.draw_y[live]
+        np.subtract(self.x[live] * scale, radius, out=draw_x, casting="unsafe")
+        np.subtract(self.y[live] * scale, radius, out=draw_y, casting="unsafe")
+        rects = surface.blits(zip(map(sprites.__getitem__, size.tolist()),
+                                  zip(draw_x.tolist(), draw_y.tolist())),
+                              doreturn=dirty is not None)
+        if dirty is not None:
+            dirty.extend(rects)
@@ -0,0 +1,299 @@
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_right
+
+# Histogram bucket upper edges in ms, doubling every two buckets (10us .. ~300ms)
+HISTOGRAM_EDGES_MS = [0.01 * 2 ** (i / 2) for i in range(30)]
+
+
+class RollingStats:
+    """Rolling window and session total and maximum of one value per frame"""
+
+    __slots__ = ("window", "index", "count", "total", "max")
+
+    def __init__(self, size):
+        self.window = array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        window = self.window
+        window[self.index] = value
+        self.index = (self.index + 1) % len(window)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, points=(50, 95, 99)):
+        """Percentiles over the rolling window"""
+        values = sorted(self.window[:min(self.count, len(self.window))])
+        if not values:
+            return [0.0 for p in points]
+        return [values[min(len(values) - 1, len(values) * p // 100)] for p in points]
+
+
+class PhaseStats(RollingStats):
+    """Rolling window and session histogram of one phase's time per frame, in ms"""
+
+    __slots__ = ("histogram",)
+
+    def __init__(self, size):
+        RollingStats.__init__(self, size)
+        self.histogram = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+
+    def add(self, ms):
+        self.histogram[bisect_right(HISTOGRAM_EDGES_MS, ms)] += 1
+        RollingStats.add(self, ms)
+
+    @property
+    def total_ms(self):
+        return self.total
+
+    @property
+    def max_ms(self):
+        return self.max
+
+
+class FrameProfiler:
+    """Lap-timer profiler for the phases of each frame
+
+    begin_frame() starts a frame, mark(name) charges the time since the
+    previous mark to the named phase, and end_frame() folds the frame into
+    per-phase rolling percentiles and session histograms. A mark is one
+    perf_counter_ns() call and a dict update, so it can stay on in release
+    builds. Phases marked several times in a frame (like one per sim tick)
+    are summed.
+    """
+
+    def __init__(self, window=600, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.stats = {}
+        self.frame = {}
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.frames = 0
+        self.session_start = time.time()
+
+    def begin_frame(self):
+        """Start timing a frame, dropping marks from one that never ended"""
+        self.frame.clear()
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        frame = self.frame
+        frame[name] = frame.get(name, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        stats = self.stats
+        for name, ns in self.frame.items():
+            phase = stats.get(name)
+            if phase is None:
+                phase = stats[name] = PhaseStats(self.window)
+            phase.add(ns / 1e6)
+        total = stats.get("frame")
+        if total is None:
+            total = stats["frame"] = PhaseStats(self.window)
+        total.add((now - self.frame_start) / 1e6)
+        self.frame.clear()
+        self.frames += 1
+
+    def summary(self):
+        """(phase, p50, p95, p99) rows, slowest p95 first, frame total last"""
+        rows = [(name, *phase.percentiles()) for name, phase in self.stats.items() if name != "frame"]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        if "frame" in self.stats:
+            rows.append(("frame", *self.stats["frame"].percentiles()))
+        return rows
+
+    def export(self, path, extra=None):
+        """Write the session's per-phase histograms and percentiles as JSON
+
+        extra is merged into the top level of the report.
+        """
+        report = {
+            "session_start": self.session_start,
+            "session_seconds": time.time() - self.session_start,
+            "frames": self.frames,
+            "histogram_edges_ms": HISTOGRAM_EDGES_MS,
+            "phases": {}
+        }
+        for name, phase in self.stats.items():
+            p50, p95, p99 = phase.percentiles()
+            report["phases"][name] = {
+                "frames": phase.count,
+                "mean_ms": phase.total_ms / phase.count if phase.count else 0.0,
+                "max_ms": phase.max_ms,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "histogram": phase.histogram
+            }
+        if extra:
+            report.update(extra)
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+class AllocationMonitor:
+    """Per-frame allocation and garbage-collection accounting
+
+    begin_frame()/end_frame() bracket the steady-state part of a frame.
+    Each frame records how many gc-tracked objects (lists, tuples, dicts,
+    instances) it left alive, which is what the collector's generation-0
+    threshold counts, and how many memory blocks it left allocated.
+    Collections are timed through gc.callbacks wherever they happen. A
+    frame that keeps more than budget objects or pauses for a collection
+    is a regression: it is counted and the first report_limit are printed.
+    The first warmup frames fill caches and are recorded but never flagged.
+
+    With trace=True tracemalloc also records the transient bytes each frame
+    peaks at, and report() lists the allocation sites that grew the most
+    since tracing started. Tracing makes every allocation several times
+    slower, so use it to find a regression, not to time frames.
+    """
+
+    def __init__(self, budget=64, window=600, trace=False, report_limit=10, warmup=30):
+        self.budget = budget
+        self.warmup = warmup
+        self.trace = trace
+        self.report_limit = report_limit
+        self.objects = RollingStats(window)  # gc-tracked objects kept per frame
+        self.blocks = RollingStats(window)  # memory blocks kept per frame
+        self.transient = RollingStats(window)  # peak KiB allocated within a frame (trace only)
+        self.pauses = PhaseStats(window)  # ms per collection
+        self.collections = [0, 0, 0]  # by generation
+        self.frame_collections = 0  # collections during measured frames
+        self.frames = 0
+        self.regressions = 0
+        self.in_frame = False
+        self.frame_gc_ms = 0.0
+        self.gc_start = 0.0
+        self.base_objects = self.kept_objects = self.base_blocks = 0
+        self.base_traced = 0
+        self.first_snapshot = None
+        gc.callbacks.append(self.on_gc)
+        if trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(4)
+            self.first_snapshot = tracemalloc.take_snapshot()
+
+    def close(self):
+        """Stop listening to the collector"""
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+            if self.in_frame:
+                # The collection resets the generation-0 count; bank what the frame added
+                self.kept_objects += gc.get_count()[0] - self.base_objects
+                self.base_objects = 0
+            return
+        ms = (time.perf_counter() - self.gc_start) * 1000
+        self.pauses.add(ms)
+        self.collections[info["generation"]] += 1
+        if self.in_frame:
+            self.frame_collections += 1
+            self.frame_gc_ms += ms
+
+    def begin_frame(self):
+        self.in_frame = True
+        self.frame_gc_ms = 0.0
+        self.kept_objects = 0
+        if self.trace:
+            self.base_traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.base_blocks = sys.getallocatedblocks()
+        self.base_objects = gc.get_count()[0]
+
+    def end_frame(self):
+        objects = self.kept_objects + gc.get_count()[0] - self.base_objects
+        blocks = sys.getallocatedblocks() - self.base_blocks
+        self.in_frame = False
+        self.frames += 1
+        self.objects.add(objects)
+        self.blocks.add(blocks)
+        if self.trace:
+            self.transient.add((tracemalloc.get_traced_memory()[1] - self.base_traced) / 1024)
+        if self.frames > self.warmup and (objects > self.budget or self.frame_gc_ms):
+            self.regressions += 1
+            if self.regressions <= self.report_limit:
+                print(f"Allocation budget: frame {self.frames} kept {objects} objects "
+                      f"(budget {self.budget}) and {blocks} blocks, "
+                      f"{self.frame_gc_ms:.2f} ms in garbage collection")
+
+    def summary(self):
+        """Short text lines for an overlay"""
+        p50, p95, p99 = self.objects.percentiles()
+        lines = [f"objs/frame {p50:.0f} {p95:.0f} {p99:.0f} over {self.regressions}",
+                 f"gc {'/'.join(map(str, self.collections))} max {self.pauses.max_ms:.1f}ms "
+                 f"{self.frame_collections} in play"]
+        if self.trace:
+            lines.append(f"transient p95 {self.transient.percentiles((95,))[0]:.0f} KiB")
+        return lines
+
+    def report(self, top=10):
+        """Session totals as a dict, for the profile export"""
+        p50, p95, p99 = self.objects.percentiles()
+        report = {
+            "frames": self.frames,
+            "budget_objects": self.budget,
+            "frames_over_budget": self.regressions,
+            "objects_per_frame": {"p50": p50, "p95": p95, "p99": p99, "max": self.objects.max,
+                                  "mean": self.objects.mean()},
+            "blocks_per_frame_mean": self.blocks.mean(),
+            "gc_collections": self.collections,
+            "gc_collections_in_frames": self.frame_collections,
+            "gc_pause_max_ms": self.pauses.max_ms,
+            "gc_pause_total_ms": self.pauses.total_ms,
+            "gc_frozen_objects": gc.get_freeze_count()
+        }
+        if self.trace and tracemalloc.is_tracing():
+            p50, p95, p99 = self.transient.percentiles()
+            report["transient_kb_per_frame"] = {"p50": p50, "p95": p95, "p99": p99,
+                                                "max": self.transient.max}
+            growth = tracemalloc.take_snapshot().compare_to(self.first_snapshot, "lineno")
+            report["top_growth"] = [{"site": str(stat.traceback), "kb": stat.size_diff / 1024,
+                                     "count": stat.count_diff} for stat in growth[:top]]
+        return report
+
+
+class StartupTimer:
+    """Wall-clock phases from process start to the first frame on screen"""
+
+    def __init__(self, start=None):
+        self.start = self.last = start if start is not None else time.perf_counter()
+        self.phases = []
+        self.total_ms = None
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def finish(self):
+        """Record the first frame; later calls are ignored"""
+        if self.total_ms is None:
+            self.mark("first_frame")
+            self.total_ms = (self.last - self.start) * 1000
+
+    def report(self):
+        return {"total_ms": self.total_ms, "phases": dict(self.phases)}
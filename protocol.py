@@ -0,0 +1,253 @@
+import struct
+
+from replay import ReplayError, read_varint, write_varint
+from simulation import POWER_UP_TYPES, Simulation
+from store import ObstacleSet, PowerUp
+
+# Network protocol between server.py and its clients. Every message is
+#   length u16 (kind byte plus payload) | kind u8 | payload
+# Client to server:
+#   JOIN     seed u64 (0: server picks), drone index u8, curve index u8
+#   FLAP     no payload; applied on the session's next tick
+#   RESTART  seed u64 (0: server picks); starts a new game in the session
+# Server to client:
+#   WELCOME  session id u32, seed u64, drone index u8, curve index u8, obstacle gap u16
+#   STATE    what changed since the previous STATE (see StateEncoder)
+FRAME = struct.Struct("<HB")
+JOIN, FLAP, RESTART = 1, 2, 3
+WELCOME, STATE = 16, 17
+
+JOIN_PAYLOAD = struct.Struct("<QBB")
+RESTART_PAYLOAD = struct.Struct("<Q")
+WELCOME_PAYLOAD = struct.Struct("<IQBBH")
+
+# STATE payload:
+#   flags u8 (NEW_GAME: clear everything first) | ticks advanced varint
+#   change mask u8, then each changed field of FIELDS in order
+#   obstacles retired varint | new obstacle count varint | each: OBSTACLE, then its gap ys as u16
+#   power-ups retired varint | new power-up count varint | each: POWER_UP
+#   newly collected power-up count varint | each: its position in the live power-ups varint
+# scroll is how far the course moved since the previous STATE; everything
+# already sent moves left by it, so entries are only sent when they spawn.
+NEW_GAME = 1
+FIELDS = [("drone_x", "f"), ("drone_y", "f"), ("drone_vel_y", "f"), ("score", "I"),
+          ("status", "B"), ("scroll", "f")]
+FIELD_STRUCTS = [struct.Struct("<" + fmt) for name, fmt in FIELDS]
+OBSTACLE = struct.Struct("<fB")  # x, segments
+GAP_Y = struct.Struct("<H")
+POWER_UP = struct.Struct("<BfH")  # type index, x, y
+
+# status bits: game over, then one per active power-up type
+GAME_OVER = 1
+POWER_UP_NAMES = list(POWER_UP_TYPES)
+
+
+class ProtocolError(ValueError):
+    """A malformed or unexpected message"""
+
+
+def frame(kind, payload=b""):
+    return FRAME.pack(len(payload) + 1, kind) + payload
+
+
+class FrameReader:
+    """Splits a byte stream into (kind, payload) messages"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return the messages they complete"""
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        offset = 0
+        while len(buffer) - offset >= FRAME.size:
+            length, kind = FRAME.unpack_from(buffer, offset)
+            if not length:
+                raise ProtocolError("empty frame")
+            end = offset + 2 + length
+            if end > len(buffer):
+                break
+            messages.append((kind, bytes(buffer[offset + FRAME.size:end])))
+            offset = end
+        del buffer[:offset]
+        return messages
+
+
+def status_bits(sim):
+    status = GAME_OVER if sim.game_over else 0
+    for name in sim.active_power_ups:
+        status |= 2 << POWER_UP_NAMES.index(name)
+    return status
+
+
+class StateEncoder:
+    """Encodes what changed in a Simulation since the last encode() as a STATE
+
+    Scalars are sent only when they changed, and obstacles and power-ups
+    only once, when they spawn. The caller adds each tick's last_scroll to
+    scroll. Applying every STATE in order to a StateMirror tracks the game
+    to float32 precision. Skipping encode() for a while is safe: the next
+    one covers everything since the previous.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.new_game()
+
+    def new_game(self):
+        """Start over after sim.reset(); the next STATE tells the client to clear"""
+        self.fresh = True
+        self.tick = 0
+        self.scroll = 0.0
+        self.sent = [None] * len(FIELDS)
+        self.obstacles_retired = self.obstacles_next = 0
+        self.power_ups_retired = self.power_ups_next = 0
+        self.collected = set()  # ids of power-ups already reported collected
+
+    def encode(self):
+        sim = self.sim
+        out = bytearray((NEW_GAME if self.fresh else 0,))
+        self.fresh = False
+        write_varint(out, sim.tick - self.tick)
+        self.tick = sim.tick
+
+        values = (sim.drone_x, sim.drone_y, sim.drone_vel_y, sim.score, status_bits(sim), self.scroll)
+        self.scroll = 0.0
+        sent = self.sent
+        mask = 0
+        changed = bytearray()
+        for i, value in enumerate(values):
+            if value != sent[i]:
+                sent[i] = value
+                mask |= 1 << i
+                changed += FIELD_STRUCTS[i].pack(value)
+        out.append(mask)
+        out += changed
+
+        obstacles = sim.obstacles
+        retired = obstacles.retired
+        write_varint(out, retired - self.obstacles_retired)
+        self.obstacles_retired = retired
+        start, end = max(self.obstacles_next, retired), retired + len(obstacles)
+        write_varint(out, end - start)
+        for i in range(start - retired, end - retired):
+            obstacle = obstacles[i]
+            out += OBSTACLE.pack(obstacle.x, len(obstacle.gap_ys))
+            for gap_y in obstacle.gap_ys:
+                out += GAP_Y.pack(gap_y)
+        self.obstacles_next = end
+
+        power_ups = sim.power_ups
+        retired = power_ups.retired
+        write_varint(out, retired - self.power_ups_retired)
+        if retired != self.power_ups_retired:
+            self.collected = {i for i in self.collected if i >= retired}
+        self.power_ups_retired = retired
+        start, end = max(self.power_ups_next, retired), retired + len(power_ups)
+        write_varint(out, end - start)
+        for i in range(start - retired, end - retired):
+            power_up = power_ups[i]
+            out += POWER_UP.pack(POWER_UP_NAMES.index(power_up.type), power_up.x, power_up.y)
+        self.power_ups_next = end
+
+        collected = [i for i, power_up in enumerate(power_ups)
+                     if power_up.collected and retired + i not in self.collected]
+        write_varint(out, len(collected))
+        for i in collected:
+            write_varint(out, i)
+            self.collected.add(retired + i)
+        return bytes(out)
+
+
+class StateMirror:
+    """Client-side copy of a server session, rebuilt from STATE messages
+
+    Carries the Simulation attributes a renderer or bot reads (drone,
+    score, active power-ups, obstacles and power-ups as store records), so
+    players from bots.py can fly it directly.
+    """
+
+    WIDTH, HEIGHT = Simulation.WIDTH, Simulation.HEIGHT
+    DRONE_RADIUS = Simulation.DRONE_RADIUS
+    OBSTACLE_WIDTH = Simulation.OBSTACLE_WIDTH
+    POWER_UP_RADIUS = Simulation.POWER_UP_RADIUS
+
+    def __init__(self, obstacle_gap):
+        self.OBSTACLE_GAP = obstacle_gap
+        self.clear()
+
+    def clear(self):
+        self.tick = 0
+        self.drone_x = self.drone_y = self.drone_vel_y = 0.0
+        self.score = 0
+        self.status = 0
+        self.scroll = 0.0
+        self.game_over = False
+        self.active_power_ups = set()
+        self.obstacles = []
+        self.power_ups = []
+
+    def apply(self, payload):
+        try:
+            self.decode(payload)
+        except (ReplayError, struct.error, IndexError) as e:
+            raise ProtocolError(f"bad state message: {e}")
+
+    def decode(self, payload):
+        if payload[0] & NEW_GAME:
+            self.clear()
+        ticks, offset = read_varint(payload, 1)
+        self.tick += ticks
+
+        mask = payload[offset]
+        offset += 1
+        for i, (name, fmt) in enumerate(FIELDS):
+            if mask & 1 << i:
+                value, = FIELD_STRUCTS[i].unpack_from(payload, offset)
+                offset += FIELD_STRUCTS[i].size
+                setattr(self, name, value)
+        self.game_over = bool(self.status & GAME_OVER)
+        self.active_power_ups = {name for i, name in enumerate(POWER_UP_NAMES)
+                                 if self.status & 2 << i}
+
+        scroll = self.scroll
+        for obstacle in self.obstacles:
+            obstacle.x -= scroll
+        for power_up in self.power_ups:
+            power_up.x -= scroll
+
+        retired, offset = read_varint(payload, offset)
+        del self.obstacles[:retired]
+        count, offset = read_varint(payload, offset)
+        for _ in range(count):
+            obstacle = ObstacleSet()
+            obstacle.x, segments = OBSTACLE.unpack_from(payload, offset)
+            offset += OBSTACLE.size
+            obstacle.gap_ys = tuple(GAP_Y.unpack_from(payload, offset + 2 * i)[0]
+                                    for i in range(segments))
+            offset += 2 * segments
+            obstacle.width = self.OBSTACLE_WIDTH
+            obstacle.gap_top = max(obstacle.gap_ys)
+            obstacle.gap_bottom = min(obstacle.gap_ys) + self.OBSTACLE_GAP
+            self.obstacles.append(obstacle)
+
+        retired, offset = read_varint(payload, offset)
+        del self.power_ups[:retired]
+        count, offset = read_varint(payload, offset)
+        for _ in range(count):
+            power_up = PowerUp()
+            type_index, power_up.x, power_up.y = POWER_UP.unpack_from(payload, offset)
+            offset += POWER_UP.size
+            power_up.type = POWER_UP_NAMES[type_index]
+            power_up.radius = self.POWER_UP_RADIUS
+            self.power_ups.append(power_up)
+
+        count, offset = read_varint(payload, offset)
+        for _ in range(count):
+            i, offset = read_varint(payload, offset)
+            self.power_ups[i].collected = True
+
+        if offset != len(payload):
+            raise ProtocolError("trailing data after state")
@@ -0,0 +1,123 @@
+import weakref
+
+import pygame
+
+
+class RenderTarget:
+    """Internal-resolution canvas the game draws on, upscaled once per frame
+
+    Callers keep drawing in gameplay coordinates (width x height); blit()
+    maps positions, source areas and surfaces onto a canvas scale times that
+    size. When the canvas is the same size as the display it is the display
+    surface itself and present() does nothing; otherwise present() resizes
+    the whole canvas onto the display in one call. Scaled copies of blitted
+    surfaces are cached for as long as the original is alive.
+    """
+
+    def __init__(self, display, width, height, scale=1.0, smooth=True):
+        self.display = display
+        self.width, self.height = width, height
+        self.smooth = smooth
+        self.scaled = weakref.WeakKeyDictionary()
+        self.set_scale(scale)
+
+    def canvas_size(self, scale):
+        """Canvas size at a scale of the gameplay size"""
+        return max(1, round(self.width * scale)), max(1, round(self.height * scale))
+
+    def set_scale(self, scale):
+        """Switch to a canvas scale times the gameplay size; its contents are lost"""
+        self.scale = scale
+        size = self.canvas_size(scale)
+        self.direct = size == self.display.get_size()
+        self.canvas = self.display if self.direct else pygame.Surface(size).convert()
+        self.scaled.clear()
+
+    def surface(self, surface):
+        """surface resized to the canvas scale (nearest-neighbour, keeping colour keys)"""
+        if self.scale == 1:
+            return surface
+        scaled = self.scaled.get(surface)
+        if scaled is None:
+            width, height = surface.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            scaled = self.scaled[surface] = pygame.transform.scale(surface, size)
+        return scaled
+
+    def forget(self, surface):
+        """Drop the scaled copy of a surface that was redrawn in place"""
+        self.scaled.pop(surface, None)
+
+    def blit(self, surface, position, area=None):
+        """Blit at gameplay coordinates; returns the canvas rect drawn"""
+        scale = self.scale
+        if scale == 1:
+            return self.canvas.blit(surface, position, area)
+        x, y = position
+        if area is not None:
+            left, top, width, height = area
+            area = (round(left * scale), round(top * scale), round(width * scale), round(height * scale))
+        return self.canvas.blit(self.surface(surface), (round(x * scale), round(y * scale)), area)
+
+    def present(self):
+        """Resize the canvas onto the display, if they differ"""
+        if self.direct:
+            return
+        if self.smooth:
+            pygame.transform.smoothscale(self.canvas, self.display.get_size(), self.display)
+        else:
+            pygame.transform.scale(self.canvas, self.display.get_size(), self.display)
+
+
+class DynamicResolution:
+    """Picks the render scale from how long recent frames took to produce
+
+    update() takes each frame's work time (everything but waiting for the
+    next frame) and keeps a moving average. When the average misses the
+    budget the scale drops one step; when it fits in headroom of the budget
+    the scale goes back up one, never above top. After a change the scale
+    holds for cooldown frames, so the average can settle at the new
+    resolution first. A drop that did not make frames cheaper (the upscale
+    can cost more than the smaller canvas saves) is undone and not tried
+    again for ten cooldowns.
+    """
+
+    SCALES = (1.0, 0.85, 0.7, 0.5)
+
+    def __init__(self, budget_ms, top=1.0, headroom=0.6, cooldown=60):
+        self.budget_ms = budget_ms
+        self.scales = (top,) + tuple(scale for scale in self.SCALES if scale < top)
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.index = 0
+        self.average_ms = 0.0
+        self.frames = 0  # since the last change
+        self.hold = cooldown
+        self.lowered_from = None  # average before the last drop, until it is judged
+        self.changes = 0
+
+    @property
+    def scale(self):
+        return self.scales[self.index]
+
+    def update(self, work_ms):
+        """Fold in one frame's work time and return the scale to render at"""
+        self.average_ms += (work_ms - self.average_ms) * 0.1
+        self.frames += 1
+        if self.frames < self.hold:
+            return self.scale
+        lowered_from, self.lowered_from = self.lowered_from, None
+        if lowered_from is not None and self.average_ms > lowered_from * 0.95:
+            self.step(-1, self.cooldown * 10)
+        elif self.average_ms > self.budget_ms and self.index < len(self.scales) - 1:
+            self.lowered_from = self.average_ms
+            self.step(1, self.cooldown)
+        elif self.average_ms < self.budget_ms * self.headroom and self.index > 0:
+            self.step(-1, self.cooldown)
+        return self.scale
+
+    def step(self, steps, hold):
+        self.index += steps
+        self.hold = hold
+        self.frames = 0
+        self.changes += 1
@@ -0,0 +1,221 @@
+import os
+import struct
+
+from simulation import Simulation, DRONES
+from levels import CURVES
+
+# Replay file layout (all little-endian):
+#   magic "FFR2" | seed u64 | drone index u8 | curve index u8 | start weather
+#   then events, each a varint (tick delta << 2 | kind) plus its payload:
+#     FLAP     no payload
+#     WEATHER  weather, then transition ticks as a varint
+#     END      final score as a varint; always the last event
+#   weather is a presence byte, then temperature f64, wind speed f64, code u8
+MAGIC = b"FFR2"
+HEADER = struct.Struct("<QBB")
+WEATHER = struct.Struct("<ddB")
+
+FLAP, WEATHER_CHANGE, END = 0, 1, 2
+
+
+class ReplayError(ValueError):
+    """A replay that is malformed or does not reproduce its recorded result"""
+
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    """Decode a varint at offset, returning (value, next offset)"""
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError("truncated replay")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def write_weather(buffer, conditions):
+    if conditions is None:
+        buffer.append(0)
+        return
+    buffer.append(1)
+    buffer += WEATHER.pack(conditions["temperature"], conditions["wind_speed"],
+                           conditions["weather_code"])
+
+
+def read_weather(data, offset):
+    if offset >= len(data):
+        raise ReplayError("truncated replay")
+    if not data[offset]:
+        return None, offset + 1
+    try:
+        temperature, wind_speed, code = WEATHER.unpack_from(data, offset + 1)
+    except struct.error:
+        raise ReplayError("truncated replay")
+    conditions = {"temperature": temperature, "wind_speed": wind_speed, "weather_code": code}
+    return conditions, offset + 1 + WEATHER.size
+
+
+class Recorder:
+    """Records one game of a Simulation as a compact binary replay
+
+    Create it right after sim.reset(), before the first step. The
+    simulation reports every flap and weather change while attached, and
+    finish() detaches it and returns the replay bytes. Flaps are one byte
+    each at normal play rates, so a ten-minute run is a few KB.
+    """
+
+    def __init__(self, sim):
+        if sim.tick != 0:
+            raise ValueError(f"recording must start at tick 0, the simulation is at tick {sim.tick}")
+        if sim.seed is None or sim.course.seed != sim.seed:
+            raise ValueError("the simulation's seed is not the seed of its course; reset() it first")
+        self.sim = sim
+        self.buffer = bytearray(MAGIC)
+        self.buffer += HEADER.pack(sim.seed, DRONES.index(sim.drone), list(CURVES).index(sim.curve))
+        write_weather(self.buffer, sim.weather_conditions)
+        self.last_tick = sim.tick
+        sim.recorder = self
+
+    def event(self, tick, kind):
+        write_varint(self.buffer, (tick - self.last_tick) << 2 | kind)
+        self.last_tick = tick
+
+    def flap(self, tick):
+        self.event(tick, FLAP)
+
+    def weather(self, tick, conditions, transition_ticks):
+        self.event(tick, WEATHER_CHANGE)
+        write_weather(self.buffer, conditions)
+        write_varint(self.buffer, transition_ticks)
+
+    def finish(self):
+        """Stop recording and return the replay, ending at the current tick and score"""
+        self.event(self.sim.tick, END)
+        write_varint(self.buffer, self.sim.score)
+        self.sim.recorder = None
+        return bytes(self.buffer)
+
+
+class Replay:
+    """Decoded replay: seed, drone, course curve, starting weather and the event stream"""
+
+    def __init__(self, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ReplayError("not a FlightForge replay")
+        try:
+            self.seed, drone, curve = HEADER.unpack_from(data, len(MAGIC))
+            self.drone = DRONES[drone]
+            self.curve = list(CURVES)[curve]
+        except (struct.error, IndexError):
+            raise ReplayError("bad replay header")
+        self.weather, offset = read_weather(data, len(MAGIC) + HEADER.size)
+
+        # Events as (tick, kind, payload), payload being (conditions, ticks) for weather
+        self.events = []
+        tick = 0
+        while True:
+            value, offset = read_varint(data, offset)
+            tick += value >> 2
+            kind = value & 3
+            if kind == FLAP:
+                self.events.append((tick, FLAP, None))
+            elif kind == WEATHER_CHANGE:
+                conditions, offset = read_weather(data, offset)
+                transition_ticks, offset = read_varint(data, offset)
+                self.events.append((tick, WEATHER_CHANGE, (conditions, transition_ticks)))
+            elif kind == END:
+                self.end_tick = tick
+                self.score, offset = read_varint(data, offset)
+                break
+            else:
+                raise ReplayError(f"unknown replay event {kind}")
+        if offset != len(data):
+            raise ReplayError("trailing data after replay end")
+
+    def simulate(self, sim=None):
+        """Re-run the game headless and return the Simulation at the end tick"""
+        if sim is None:
+            sim = Simulation(drone=self.drone, weather=self.weather, curve=self.curve)
+        else:
+            sim.drone = self.drone
+            sim.curve = self.curve
+            sim.apply_weather(self.weather)
+        sim.reset(self.seed)
+
+        step = sim.step
+        for tick, kind, payload in self.events:
+            while sim.tick < tick and not sim.game_over:
+                step()
+            if sim.game_over:
+                break  # events past the crash: verify() reports the mismatch
+            if kind == FLAP:
+                step(True)
+            else:
+                sim.apply_weather(*payload)
+        while sim.tick < self.end_tick and not sim.game_over:
+            step()
+        return sim
+
+    def verify(self, sim=None):
+        """Raise ReplayError unless re-simulation reproduces the recorded tick and score"""
+        sim = self.simulate(sim)
+        if sim.tick != self.end_tick or sim.score != self.score:
+            raise ReplayError(f"replay claims score {self.score} at tick {self.end_tick}, "
+                              f"re-simulation gives {sim.score} at tick {sim.tick}")
+        return sim
+
+
+def verify_file(path):
+    """Verify one replay file, returning (path, score, ticks, error)"""
+    try:
+        with open(path, "rb") as file:
+            replay = Replay(file.read())
+        replay.verify()
+    except (OSError, ReplayError) as e:
+        return path, None, None, str(e)
+    return path, replay.score, replay.end_tick, None
+
+
+def main():
+    # CLI-only imports, kept out of the game's startup path
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="Verify FlightForge replays by re-simulation")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(".ffr"))
+        else:
+            paths.append(path)
+
+    failures = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        for path, score, ticks, error in pool.imap_unordered(verify_file, paths, chunksize=16):
+            if error:
+                failures += 1
+                print(f"{path}: FAILED {error}")
+            else:
+                print(f"{path}: ok, score {score} in {ticks} ticks")
+    print(f"{len(paths) - failures}/{len(paths)} replays verified")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
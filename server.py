@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import random
+import time
+
+from simulation import Simulation, DRONES
+from levels import CURVES
+from profiler import PhaseStats
+from protocol import (FLAP, JOIN, JOIN_PAYLOAD, RESTART, RESTART_PAYLOAD, STATE, WELCOME,
+                      WELCOME_PAYLOAD, FrameReader, ProtocolError, StateEncoder, frame)
+
+
+class Session:
+    """One client's game: its Simulation, queued input and state encoder"""
+
+    def __init__(self, session_id, transport, seed, drone, curve):
+        self.id = session_id
+        self.transport = transport
+        self.sim = Simulation(seed=seed, drone=drone, curve=curve)
+        self.encoder = StateEncoder(self.sim)
+        self.flap_pending = False
+        self.restart_seed = None  # seed of a queued restart
+
+    def restart(self, seed):
+        """Queue a new game for the next tick; flaps sent before it are dropped"""
+        self.restart_seed = seed
+        self.flap_pending = False
+
+    def step(self):
+        sim = self.sim
+        if self.restart_seed is not None:
+            sim.reset(self.restart_seed)
+            self.encoder.new_game()
+            self.restart_seed = None
+        if not sim.game_over:
+            sim.step(self.flap_pending)
+            self.encoder.scroll += sim.last_scroll
+        self.flap_pending = False
+
+
+class ClientConnection(asyncio.Protocol):
+    """Feeds one client's messages to the server; input waits for the next tick"""
+
+    def __init__(self, server):
+        self.server = server
+        self.reader = FrameReader()
+        self.transport = None
+        self.session = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        try:
+            for kind, payload in self.reader.feed(data):
+                self.handle(kind, payload)
+        except ProtocolError as e:
+            print(f"Dropping client: {e}")
+            self.transport.close()
+
+    def handle(self, kind, payload):
+        if kind == JOIN and self.session is None:
+            self.session = self.server.join(self.transport, payload)
+        elif self.session is None:
+            raise ProtocolError(f"message {kind} before JOIN")
+        elif kind == FLAP:
+            self.session.flap_pending = True
+        elif kind == RESTART:
+            if len(payload) != RESTART_PAYLOAD.size:
+                raise ProtocolError("bad RESTART")
+            seed, = RESTART_PAYLOAD.unpack(payload)
+            self.session.restart(seed or self.server.new_seed())
+        else:
+            raise ProtocolError(f"unexpected message {kind}")
+
+    def connection_lost(self, exc):
+        if self.session:
+            self.server.leave(self.session)
+
+
+class GameServer:
+    """Hosts many game sessions, all stepped by one fixed-rate tick loop
+
+    Each tick steps every session once, back to back, then every
+    send_every ticks writes each client one STATE covering what changed
+    since its last one (about 20 bytes at 60 Hz). Client input is only
+    queued by the connection callbacks and applied on the next tick, so the
+    loop is the only place games change. A client whose socket backs up
+    beyond MAX_BUFFERED bytes is skipped until it drains; its next STATE
+    covers the gap. If the loop falls behind it catches up at most
+    MAX_CATCH_UP ticks at once and drops the rest, like the game's frame
+    loop.
+    """
+
+    MAX_CATCH_UP = 8
+    MAX_BUFFERED = 64 * 1024
+
+    def __init__(self, send_every=1, seed=None):
+        self.send_every = send_every
+        self.rng = random.Random(seed)
+        self.sessions = {}
+        self.next_id = 1
+        self.tick = 0
+        self.dropped_ticks = 0
+        self.tick_stats = PhaseStats(Simulation.TICK_RATE * 10)
+
+    def new_seed(self):
+        return self.rng.getrandbits(32) or 1
+
+    def join(self, transport, payload):
+        if len(payload) != JOIN_PAYLOAD.size:
+            raise ProtocolError("bad JOIN")
+        seed, drone, curve = JOIN_PAYLOAD.unpack(payload)
+        if drone >= len(DRONES) or curve >= len(CURVES):
+            raise ProtocolError("unknown drone or curve")
+        seed = seed or self.new_seed()
+        session = Session(self.next_id, transport, seed, DRONES[drone], list(CURVES)[curve])
+        self.sessions[session.id] = session
+        self.next_id += 1
+        transport.write(frame(WELCOME, WELCOME_PAYLOAD.pack(session.id, seed, drone, curve,
+                                                            session.sim.OBSTACLE_GAP)))
+        return session
+
+    def leave(self, session):
+        self.sessions.pop(session.id, None)
+        session.sim.course.stop()
+
+    def run_tick(self):
+        start = time.perf_counter()
+        sessions = self.sessions.values()
+        for session in sessions:
+            session.step()
+        self.tick += 1
+
+        if self.tick % self.send_every == 0:
+            for session in sessions:
+                transport = session.transport
+                if transport.is_closing():
+                    continue  # connection_lost() has not run yet
+                if transport.get_write_buffer_size() < self.MAX_BUFFERED:
+                    transport.write(frame(STATE, session.encoder.encode()))
+        self.tick_stats.add((time.perf_counter() - start) * 1000)
+
+    async def tick_loop(self, report_every=5.0):
+        loop = asyncio.get_running_loop()
+        period = 1 / Simulation.TICK_RATE
+        next_tick = next_report = loop.time()
+        while True:
+            ticks = 0
+            while loop.time() >= next_tick:
+                if ticks == self.MAX_CATCH_UP:
+                    # Too far behind: drop the backlog instead of spiralling
+                    behind = int((loop.time() - next_tick) / period)
+                    self.dropped_ticks += behind
+                    next_tick += behind * period
+                    break
+                self.run_tick()
+                next_tick += period
+                ticks += 1
+
+            if report_every and loop.time() >= next_report:
+                next_report += report_every
+                self.report(period * 1000)
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def report(self, period_ms):
+        p50, p95, p99 = self.tick_stats.percentiles((50, 95, 99))
+        print(f"tick {self.tick}: {len(self.sessions)} sessions, tick p50 {p50:.2f} ms "
+              f"p95 {p95:.2f} ms p99 {p99:.2f} ms ({p95 / period_ms:.0%} of the tick at p95), "
+              f"{self.dropped_ticks} ticks dropped")
+
+    async def serve(self, host="127.0.0.1", port=7777, unix_path=None, report_every=5.0):
+        loop = asyncio.get_running_loop()
+        if unix_path:
+            server = await loop.create_unix_server(lambda: ClientConnection(self), unix_path)
+        else:
+            server = await loop.create_server(lambda: ClientConnection(self), host, port)
+        print(f"Serving on {unix_path or f'{host}:{port}'}")
+        async with server:
+            await self.tick_loop(report_every)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless FlightForge multi-session server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--send-every", type=int, default=1, help="ticks between state messages")
+    parser.add_argument("--seed", type=int, help="seed for the seeds handed to sessions")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args()
+
+    server = GameServer(args.send_every, args.seed)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.report_every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
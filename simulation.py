@@ -0,0 +1,502 @@
+import random
+
+from store import ObstacleSet, PowerUp, RingStore
+from levels import CURVES, Course
+from wind import WindField, wind_field
+
+# Shared game data, used by both the simulation and the pygame front end
+DRONE_STATS = {
+    "Standard": {"gravity": 0.5, "flap": -8, "color": (255, 0, 0)},
+    "Heavy-Duty": {"gravity": 0.7, "flap": -10, "color": (0, 0, 255)},
+    "Agile": {"gravity": 0.4, "flap": -7, "color": (0, 255, 0)}
+}
+DRONES = list(DRONE_STATS.keys())
+
+POWER_UP_TYPES = {
+    "shield": {"duration": 5000, "color": (255, 215, 0)},
+    "slow_time": {"duration": 3000, "color": (0, 191, 255)},
+    "double_points": {"duration": 7000, "color": (138, 43, 226)}
+}
+
+DEFAULT_WEATHER = {
+    "temperature": 20,
+    "wind_speed": 5,
+    "weather_code": 0  # 0 is clear sky
+}
+
+# Simulation events reported by step(), used by the front end for sounds
+EVENT_FLAP = "flap"
+EVENT_HIT = "hit"
+EVENT_POINT = "point"
+
+
+GAMEPLAY_DEFAULTS = {
+    "GRAVITY": 0.5,
+    "FLAP_STRENGTH": -8,
+    "SCROLL_SPEED": 3,
+    "OBSTACLE_GAP": 200,
+    "OBSTACLE_FREQUENCY": 1500  # milliseconds between obstacles
+}
+
+
+def weather_gameplay(weather_conditions, tuning=None):
+    """Map weather conditions to gameplay constants (wind, gusts, gravity, spawn rate)
+
+    tuning optionally overrides GAMEPLAY_DEFAULTS. Weather then scales the
+    tuned values rather than replacing them, so tunings that differ only in
+    (say) obstacle frequency still play differently in fog. GRAVITY and
+    FLAP_STRENGTH reach the drones as ratios to their defaults, scaling
+    each drone's own gravity and flap.
+    """
+    params = dict(GAMEPLAY_DEFAULTS, wind_force=0, gust_force=0, gust_lift=0, gust_ticks=90)
+    if tuning:
+        params.update(tuning)
+
+    if not weather_conditions:
+        return params
+
+    # Wind effects based on real wind speed
+    wind_speed = weather_conditions["wind_speed"]
+    params["wind_force"] = (wind_speed - 5) * 0.05
+
+    # Gust strength scales with wind speed and how rough the weather is;
+    # gust_ticks is how long a typical gust lasts
+    gustiness = 0.5
+
+    code = weather_conditions["weather_code"]
+    if code in [45, 48]:
+        # Reduce visibility by increasing obstacle frequency (1500 -> 1200 ms by default)
+        params["OBSTACLE_FREQUENCY"] *= 0.8
+        gustiness, params["gust_ticks"] = 0.25, 150
+    elif 51 <= code <= 67:
+        # Make gameplay harder with reduced flap strength (-8 -> -7.5 for the Standard drone)
+        params["FLAP_STRENGTH"] *= 0.9375
+        gustiness, params["gust_ticks"] = 1.0, 60
+    elif 71 <= code <= 77:
+        # Make control more slippery (0.5 -> 0.45 for the Standard drone)
+        params["GRAVITY"] *= 0.9
+        gustiness, params["gust_ticks"] = 0.8, 75
+    elif code >= 80:
+        # Make gameplay unpredictable with wind gusts (-8 -> -8.5 for the Standard drone)
+        params["FLAP_STRENGTH"] *= 1.0625
+        gustiness, params["gust_ticks"] = (2.5, 30) if code >= 95 else (1.5, 45)
+
+    params["gust_force"] = round(0.01 * wind_speed * gustiness, 3)
+    params["gust_lift"] = round(0.004 * wind_speed * gustiness, 3)
+    return params
+
+
+def warm_weather(weather_conditions):
+    """Build the gust tables weather_conditions needs, so apply_weather() finds them cached
+
+    A new gust profile takes 10-15 ms to build, which is a dropped frame if
+    apply_weather() does it mid-run; weather providers call this on their
+    fetch thread before handing new conditions to the game.
+    """
+    params = weather_gameplay(weather_conditions)
+    wind_field(params["gust_force"], params["gust_lift"], params["gust_ticks"])
+
+
+class Simulation:
+    """Headless, deterministic FlightForge game core
+
+    Holds all physics, spawning, collision and scoring state. Time advances
+    in fixed ticks (TICK_RATE per second) instead of wall-clock time and all
+    randomness comes from a seeded RNG, so the same seed and the same flap
+    inputs always produce the same game. No pygame import is needed.
+
+    The obstacle course comes from a Course generated from the seed and a
+    named difficulty curve (see levels.CURVES), so a seed shared between
+    players gives them the same course whatever their score.
+    """
+
+    WIDTH, HEIGHT = 800, 600
+    TICK_RATE = 60
+    TICK_MS = 1000 / TICK_RATE
+    DRONE_RADIUS = 20
+    OBSTACLE_WIDTH = 50
+    POWER_UP_RADIUS = 15
+
+    def __init__(self, seed=None, drone="Standard", weather=None, tuning=None, drone_stats=None,
+                 curve="classic"):
+        self.drone = drone
+        self.tuning = tuning
+        self.curve = curve
+        self.course = None
+        self.course_prefetch = 0  # chunks built ahead on a background thread (0: on demand)
+        self.obstacles = RingStore(ObstacleSet)
+        self.power_ups = RingStore(PowerUp)
+        self.drone_stats = drone_stats or DRONE_STATS
+        self.profiler = None  # optional FrameProfiler timing the phases of step()
+        self.recorder = None  # optional replay Recorder capturing inputs and weather
+        self.wind_ticks_left = self.wind_ticks_total = 0
+        self.wind_from = 0.0
+        self.gusts = self.gusts_from = None
+        self.gust_offset = 0
+        self.achievements = {
+            "First Flight": {"description": "Fly for the first time", "unlocked": False},
+            "High Flyer": {"description": "Score 10 points", "unlocked": False},
+            "Weather Navigator": {"description": "Play in special weather conditions", "unlocked": False},
+            "Master Pilot": {"description": "Score 20 points", "unlocked": False}
+        }
+        self.apply_weather(weather)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Reset all per-game state, optionally reseeding the RNG
+
+        An explicit seed is also the course seed; otherwise the next course
+        seed is drawn from the RNG. Either way self.seed is the seed of the
+        new course, which is all a replay needs to rebuild it.
+        """
+        if seed is not None or not hasattr(self, "rng"):
+            self.rng = random.Random(seed)
+        course_seed = seed if seed is not None else self.rng.getrandbits(32)
+        self.seed = course_seed
+        self.new_course(course_seed)
+        self.gust_offset = WindField.offset(course_seed)
+
+        self.tick = 0
+        self.time_ms = 0.0
+        self.course_time = 0.0  # ms of scrolled course; runs at half speed in slow time
+        self.last_scroll = 0.0  # pixels the course moved on the last tick
+        self.drone_x = 100
+        self.drone_y = self.HEIGHT // 2
+        self.drone_vel_y = 0
+        self.obstacles.clear()
+        self.next_to_score = 0  # id (spawn number) of the first obstacle not yet passed
+        self.last_obstacle_time = self.course_time
+        self.score = 0
+        self.game_over = False
+        self.power_ups.clear()
+        self.active_power_ups = {}
+        self.events = []
+
+        # A new game starts with any wind transition finished, so the
+        # current weather conditions fully describe the starting state
+        if self.wind_ticks_left:
+            self.wind_force = self.wind_to
+            self.wind_ticks_left = 0
+            self.gusts_from = None
+
+    def snapshot(self, rng=False):
+        """Capture the game state for restore() as a flat tuple
+
+        Covers the drone, score, timers, active power-ups, achievements and
+        every live obstacle and power-up, in a few microseconds, along with
+        any wind transition in progress. The course, drone and weather
+        settings are not included: a snapshot restores into the game it was
+        taken from. step() draws nothing from the RNG, so
+        its state (a 2.5 KB copy) is only captured when rng is true.
+        """
+        obstacles = self.obstacles
+        next_to_score = self.next_to_score
+        return (
+            self.tick, self.time_ms, self.course_time, self.last_scroll,
+            self.drone_x, self.drone_y, self.drone_vel_y, self.wind_force, self.wind_ticks_left,
+            self.wind_from, self.wind_to, self.wind_ticks_total, self.gusts_from,
+            self.last_obstacle_time, next_to_score, self.score, self.game_over,
+            self.active_power_ups.copy(), tuple(self.events),
+            tuple([data["unlocked"] for data in self.achievements.values()]),
+            obstacles.retired,
+            [(obstacle.x, obstacle.gap_ys, obstacle.gap_top, obstacle.gap_bottom)
+             for obstacle in obstacles],
+            self.power_ups.retired,
+            [(power_up.x, power_up.type, power_up.y, power_up.collected)
+             for power_up in self.power_ups],
+            self.rng.getstate() if rng else None
+        )
+
+    def restore(self, state):
+        """Return the game to a state captured by snapshot(); states can be restored repeatedly"""
+        (self.tick, self.time_ms, self.course_time, self.last_scroll,
+         self.drone_x, self.drone_y, self.drone_vel_y, self.wind_force, self.wind_ticks_left,
+         self.wind_from, self.wind_to, self.wind_ticks_total, self.gusts_from,
+         self.last_obstacle_time, next_to_score, self.score, self.game_over,
+         active_power_ups, events, unlocked,
+         obstacles_retired, obstacles, power_ups_retired, power_ups, rng_state) = state
+        self.next_to_score = next_to_score
+        self.events[:] = events
+        self.active_power_ups = active_power_ups.copy()
+        for data, flag in zip(self.achievements.values(), unlocked):
+            data["unlocked"] = flag
+
+        # Slots may have been reused since the snapshot, so refill them all
+        store = self.obstacles
+        store.clear(obstacles_retired)
+        width = self.OBSTACLE_WIDTH
+        for i, (x, gap_ys, gap_top, gap_bottom) in enumerate(obstacles):
+            obstacle = store.push()
+            obstacle.x = x
+            obstacle.width = width
+            obstacle.gap_ys = gap_ys
+            obstacle.gap_top = gap_top
+            obstacle.gap_bottom = gap_bottom
+            obstacle.passed = obstacles_retired + i < next_to_score
+
+        store = self.power_ups
+        store.clear(power_ups_retired)
+        radius = self.POWER_UP_RADIUS
+        for x, power_up_type, y, collected in power_ups:
+            power_up = store.push()
+            power_up.x = x
+            power_up.type = power_up_type
+            power_up.y = y
+            power_up.radius = radius
+            power_up.collected = collected
+
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
+
+    def apply_weather(self, weather_conditions, transition_ticks=0):
+        """Apply the gameplay side of the weather (wind, gravity, spawn rate)
+
+        Wind and gusts blend to the new weather over transition_ticks sim
+        ticks, so a mid-run weather change plays out the same way in a replay.
+        """
+        wind_from = getattr(self, "wind_force", 0)
+        gusts_from = self.gusts
+        for name, value in weather_gameplay(weather_conditions, self.tuning).items():
+            setattr(self, name, value)
+        self.weather_conditions = weather_conditions
+        self.gusts = wind_field(self.gust_force, self.gust_lift, self.gust_ticks)
+
+        # Each drone has its own gravity and flap, so the weather and tuning
+        # reach them as ratios to the defaults rather than as absolute values
+        self.gravity_scale = self.GRAVITY / GAMEPLAY_DEFAULTS["GRAVITY"]
+        self.flap_scale = self.FLAP_STRENGTH / GAMEPLAY_DEFAULTS["FLAP_STRENGTH"]
+
+        self.wind_to = self.wind_force
+        self.wind_ticks_left = transition_ticks
+        self.gusts_from = None
+        if transition_ticks:
+            self.wind_from = self.wind_force = wind_from
+            self.wind_ticks_total = transition_ticks
+            self.gusts_from = gusts_from
+
+        if self.recorder:
+            self.recorder.weather(self.tick, weather_conditions, transition_ticks)
+
+        # Mark weather navigation achievement
+        if weather_conditions and weather_conditions["weather_code"] != 0:
+            self.achievements["Weather Navigator"]["unlocked"] = True
+
+    def new_course(self, course_seed):
+        """Start generating the course for course_seed for the current drone and curve"""
+        if self.course:
+            self.course.stop()
+        stats = self.drone_stats[self.drone]
+        physics = {
+            "gravity": stats["gravity"],
+            "flap": stats["flap"],
+            "radius": self.DRONE_RADIUS,
+            "gap": self.OBSTACLE_GAP,
+            "height": self.HEIGHT,
+            "spacing_ticks": self.OBSTACLE_FREQUENCY / self.TICK_MS
+        }
+        self.course = Course(course_seed, CURVES[self.curve], physics, POWER_UP_TYPES)
+        if self.course_prefetch:
+            self.course.start_prefetch(self.course_prefetch)
+
+    def spawn_obstacle(self):
+        """Place the next obstacle of the course, and its power-up if it has one"""
+        gap_ys, power_up = self.course.obstacle(self.obstacles.retired + len(self.obstacles))
+
+        obstacle = self.obstacles.push()
+        obstacle.x = self.WIDTH
+        obstacle.width = self.OBSTACLE_WIDTH
+        obstacle.passed = False
+        obstacle.gap_ys = gap_ys  # the course's tuple, never changed in place
+
+        # Precompute the column's vertical clearance once
+        obstacle.gap_top = max(gap_ys)
+        obstacle.gap_bottom = min(gap_ys) + self.OBSTACLE_GAP
+
+        if power_up:
+            self.spawn_power_up(*power_up)
+
+    def spawn_power_up(self, power_up_type, y):
+        """Place a power-up at the right edge"""
+        power_up = self.power_ups.push()
+        power_up.type = power_up_type
+        power_up.x = self.WIDTH
+        power_up.y = y
+        power_up.radius = self.POWER_UP_RADIUS
+        power_up.collected = False
+
+    def flap(self):
+        """Apply drone-specific flap strength, scaled by the weather"""
+        self.drone_vel_y = self.drone_stats[self.drone]["flap"] * self.flap_scale
+        self.events.append(EVENT_FLAP)
+
+    def step(self, action=False):
+        """Advance the game by one tick; a truthy action flaps first
+
+        Returns the list of events (EVENT_*) raised during the tick. The
+        list is reused by the next step(), so copy it to keep it.
+        """
+        self.events.clear()
+        if self.game_over:
+            return self.events
+
+        if action:
+            if self.recorder:
+                self.recorder.flap(self.tick)
+            self.flap()
+
+        self.tick += 1
+        self.time_ms += self.TICK_MS
+
+        # Apply physics: drone-specific gravity, scaled by the weather
+        self.drone_vel_y += self.drone_stats[self.drone]["gravity"] * self.gravity_scale
+
+        # Apply wind from weather conditions: the steady drift plus this
+        # tick's gust at the drone's altitude, both blending after a weather change
+        gusts, gusts_from = self.gusts, self.gusts_from
+        gust_x = gust_y = 0.0
+        if gusts or gusts_from:
+            i = (WindField.band(self.drone_y, self.HEIGHT) * WindField.PERIOD
+                 + (self.tick + self.gust_offset) % WindField.PERIOD)
+            if gusts:
+                gust_x, gust_y = gusts.x[i], gusts.y[i]
+        if self.wind_ticks_left:
+            self.wind_ticks_left -= 1
+            t = 1 - self.wind_ticks_left / self.wind_ticks_total
+            self.wind_force = self.wind_from + (self.wind_to - self.wind_from) * t
+            from_x, from_y = (gusts_from.x[i], gusts_from.y[i]) if gusts_from else (0.0, 0.0)
+            gust_x = from_x + (gust_x - from_x) * t
+            gust_y = from_y + (gust_y - from_y) * t
+            if not self.wind_ticks_left:
+                self.gusts_from = None
+        self.drone_x += self.wind_force + gust_x
+        self.drone_vel_y += gust_y
+
+        # Apply slow time effect
+        time_factor = 0.5 if "slow_time" in self.active_power_ups else 1.0
+
+        # Update drone position
+        self.drone_y += self.drone_vel_y * time_factor
+
+        # Update obstacles. Spawning follows course time, so slow time slows
+        # spawning exactly as much as scrolling and obstacle spacing is unchanged.
+        self.course_time += self.TICK_MS * time_factor
+        if self.course_time - self.last_obstacle_time > self.OBSTACLE_FREQUENCY:
+            self.spawn_obstacle()
+            self.last_obstacle_time = self.course_time
+
+        # Move obstacles and power-ups
+        scroll = self.last_scroll = self.SCROLL_SPEED * time_factor
+        for obstacle in self.obstacles:
+            obstacle.x -= scroll
+        for power_up in self.power_ups:
+            power_up.x -= scroll
+
+        # Retire whatever scrolled off the left edge
+        obstacles, power_ups = self.obstacles, self.power_ups
+        while obstacles.count and obstacles.first().x <= -50:
+            obstacles.pop_left()
+        while power_ups.count and power_ups.first().x < -20:
+            power_ups.pop_left()
+
+        profiler = self.profiler
+        if profiler:
+            profiler.mark("physics")
+        self.check_collisions()
+        if profiler:
+            profiler.mark("check_collisions")
+        self.update_score()
+        if profiler:
+            profiler.mark("update_score")
+        self.check_power_up_expiry()
+
+        # Keep drone within bounds
+        if self.drone_x < 0:
+            self.drone_x = 0
+        elif self.drone_x > self.WIDTH:
+            self.drone_x = self.WIDTH
+
+        return self.events
+
+    def check_collisions(self):
+        """Check if the drone has collided with obstacles or collected power-ups"""
+        has_shield = "shield" in self.active_power_ups
+
+        # Check if drone hit the ceiling or floor
+        if self.drone_y <= 0 or self.drone_y >= self.HEIGHT:
+            if not has_shield:
+                self.game_over = True
+                self.events.append(EVENT_HIT)
+
+        # Check obstacle collisions with an axis-aligned box around the drone,
+        # same overlap rule as pygame.Rect.colliderect. Broad phase: obstacles
+        # are sorted by x, so only visit columns overlapping the drone's x-span.
+        r = self.DRONE_RADIUS
+        drone_left, drone_right = self.drone_x - r, self.drone_x + r
+        drone_top, drone_bottom = self.drone_y - r, self.drone_y + r
+
+        obstacles = self.obstacles
+        for obstacle in obstacles.iter_from(obstacles.bisect_x(drone_left - self.OBSTACLE_WIDTH)):
+            if obstacle.x >= drone_right:
+                break
+
+            if drone_top < obstacle.gap_top or drone_bottom > obstacle.gap_bottom:
+                if not has_shield:
+                    if not self.game_over:
+                        self.events.append(EVENT_HIT)
+                    self.game_over = True
+                else:
+                    # Remove shield after blocking one hit
+                    self.active_power_ups.pop("shield", None)
+
+        # Check power-up collisions, again only near the drone
+        reach = self.POWER_UP_RADIUS + r
+        power_ups = self.power_ups
+        for power_up in power_ups.iter_from(power_ups.bisect_x(self.drone_x - reach)):
+            if power_up.x >= self.drone_x + reach:
+                break
+
+            if not power_up.collected:
+                # Simple distance-based collision detection
+                dx = self.drone_x - power_up.x
+                dy = self.drone_y - power_up.y
+                pickup_reach = power_up.radius + r
+
+                if dx * dx + dy * dy < pickup_reach * pickup_reach:
+                    power_up.collected = True
+
+                    # Activate power-up
+                    power_up_type = power_up.type
+                    duration = POWER_UP_TYPES[power_up_type]["duration"]
+                    self.active_power_ups[power_up_type] = self.time_ms + duration
+
+    def update_score(self):
+        """Update score when passing obstacles"""
+        # Passed obstacles always form a prefix of the x-ordered store, so
+        # only the obstacles right after the last passed one need checking
+        obstacles = self.obstacles
+        self.next_to_score = max(self.next_to_score, obstacles.retired)
+        while self.next_to_score - obstacles.retired < len(obstacles):
+            obstacle = obstacles[self.next_to_score - obstacles.retired]
+            if self.drone_x <= obstacle.x + obstacle.width:
+                break
+            obstacle.passed = True
+            self.next_to_score += 1
+
+            # One point per segment of the column
+            for gap_y in obstacle.gap_ys:
+                self.score += 1 * (2 if "double_points" in self.active_power_ups else 1)
+                self.events.append(EVENT_POINT)
+
+            # Unlock achievements
+            if self.score >= 10:
+                self.achievements["High Flyer"]["unlocked"] = True
+            if self.score >= 20:
+                self.achievements["Master Pilot"]["unlocked"] = True
+
+    def check_power_up_expiry(self):
+        """Check and remove expired power-ups"""
+        active = self.active_power_ups
+        if not active:
+            return  # the usual case: nothing to expire and nothing to allocate
+        for power_up in [name for name, until in active.items() if until < self.time_ms]:
+            del active[power_up]
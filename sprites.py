@@ -0,0 +1,116 @@
+import pygame
+
+COLORKEY = (255, 0, 255)
+
+
+class SpriteAtlas:
+    """Pre-rendered, colour-keyed sprites for drones, power-ups and obstacles
+
+    Each sprite is drawn from primitives once, on first use, and reused for
+    every later frame. Sprites are returned with the offset from their
+    top-left corner to the point they are anchored on (drone or power-up
+    centre), so callers blit at (x - anchor_x, y - anchor_y).
+    """
+
+    MAX_PROPELLER_OFFSET = 60
+
+    def __init__(self, render_text):
+        self.render_text = render_text
+        self.sprites = {}
+        self.column_sprite = None
+        self.column_key = None
+
+    def surface(self, width, height, alpha=False):
+        """Blank colour-keyed (or per-pixel alpha) surface in the display's format"""
+        if alpha:
+            sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+            return sprite.convert_alpha() if pygame.display.get_surface() else sprite
+
+        sprite = pygame.Surface((width, height))
+        if pygame.display.get_surface():
+            sprite = sprite.convert()
+        sprite.fill(COLORKEY)
+        sprite.set_colorkey(COLORKEY)
+        return sprite
+
+    def drone(self, color, propeller_offset):
+        """Drone body with propellers raised by propeller_offset pixels"""
+        offset = min(int(propeller_offset), self.MAX_PROPELLER_OFFSET)
+        key = ("drone", color, offset)
+        entry = self.sprites.get(key)
+        if entry is None:
+            # Propellers can sit above the 20px body, so grow the top margin
+            top = max(20, offset + 3)
+            sprite = self.surface(51, top + 21)
+            cx, cy = 25, top
+
+            # Base drone shape
+            pygame.draw.circle(sprite, color, (cx, cy), 20)
+
+            # Draw propellers
+            pygame.draw.line(sprite, (50, 50, 50), (cx - 15, cy - offset), (cx - 25, cy - offset), 5)
+            pygame.draw.line(sprite, (50, 50, 50), (cx + 15, cy - offset), (cx + 25, cy - offset), 5)
+
+            # Draw body details
+            pygame.draw.rect(sprite, (80, 80, 80), (cx - 10, cy - 5, 20, 10))
+
+            entry = self.sprites[key] = (sprite, (cx, cy))
+        return entry
+
+    def ring(self, color, radius, width):
+        """Outline circle used for active power-up effects around the drone"""
+        key = ("ring", color, radius, width)
+        entry = self.sprites.get(key)
+        if entry is None:
+            sprite = self.surface(radius * 2 + 1, radius * 2 + 1)
+            pygame.draw.circle(sprite, color, (radius, radius), radius, width)
+            entry = self.sprites[key] = (sprite, (radius, radius))
+        return entry
+
+    def power_up(self, power_up_type, color, radius):
+        """Power-up disc with its type icon"""
+        key = ("power_up", power_up_type, color, radius)
+        entry = self.sprites.get(key)
+        if entry is None:
+            sprite = self.surface(radius * 2 + 1, radius * 2 + 1)
+            c = (radius, radius)
+            pygame.draw.circle(sprite, color, c, radius)
+
+            # Draw icon inside based on type
+            if power_up_type == "shield":
+                pygame.draw.circle(sprite, (255, 255, 255), c, radius - 5, 2)
+            elif power_up_type == "slow_time":
+                # Draw clock symbol
+                pygame.draw.circle(sprite, (255, 255, 255), c, radius - 5, 1)
+                pygame.draw.line(sprite, (255, 255, 255), c, (c[0] + 5, c[1] - 3), 2)
+            elif power_up_type == "double_points":
+                # Draw x2 symbol; antialiased text that overhangs the disc
+                # needs per-pixel alpha rather than a colour key
+                text = self.render_text("x2", (255, 255, 255))
+                size = max(sprite.get_width(), text.get_width(), text.get_height())
+                sprite = self.surface(size, size, alpha=True)
+                c = (size // 2, size // 2)
+                pygame.draw.circle(sprite, color, c, radius)
+                sprite.blit(text, text.get_rect(center=c))
+
+            entry = self.sprites[key] = (sprite, c)
+        return entry
+
+    def column(self, color, width, height):
+        """Full-height obstacle column; callers blit the top/bottom parts with area
+
+        Only the latest colour is kept, since weather transitions change the
+        obstacle colour every frame while they run.
+        """
+        key = (color, width, height)
+        if key != self.column_key:
+            self.column_sprite = pygame.Surface((width, height))
+            if pygame.display.get_surface():
+                self.column_sprite = self.column_sprite.convert()
+            self.column_sprite.fill(color)
+            self.column_key = key
+        return self.column_sprite
+
+    def clear(self):
+        self.sprites.clear()
+        self.column_key = None
@@ -0,0 +1,107 @@
+class ObstacleSet:
+    """One obstacle column: every segment shares x, each has its own gap
+
+    gap_top and gap_bottom are precomputed at spawn: the drone only clears
+    the column between the lowest segment top and the highest segment bottom.
+    """
+
+    __slots__ = ("x", "width", "gap_ys", "gap_top", "gap_bottom", "passed")
+
+    def __init__(self):
+        self.x = 0.0
+        self.width = 0
+        self.gap_ys = ()
+        self.gap_top = 0
+        self.gap_bottom = 0
+        self.passed = False
+
+
+class PowerUp:
+    """A collectible power-up drifting with the obstacles"""
+
+    __slots__ = ("type", "x", "y", "radius", "collected")
+
+    def __init__(self):
+        self.type = None
+        self.x = 0.0
+        self.y = 0
+        self.radius = 0
+        self.collected = False
+
+
+class RingStore:
+    """Ring buffer of reusable slot objects, kept in spawn (and so x) order
+
+    Everything scrolls left at the same speed and spawns at the right edge,
+    so the oldest entry is always the left-most one. Retiring it is a
+    constant-time head bump and slot objects are recycled, not reallocated.
+    Iterating yields live entries from left to right; bisect_x() and
+    iter_from() let callers visit only the entries near a given x.
+    """
+
+    def __init__(self, factory, capacity=8):
+        self.factory = factory
+        self.slots = [factory() for _ in range(capacity)]
+        self.head = 0
+        self.count = 0
+        self.retired = 0  # entries ever popped, to turn indexes into stable ids
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        slots, capacity = self.slots, len(self.slots)
+        for i in range(self.head, self.head + self.count):
+            yield slots[i % capacity]
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("RingStore index out of range")
+        return self.slots[(self.head + index % self.count) % len(self.slots)]
+
+    def iter_from(self, index):
+        """Yield live entries from left-to-right position index onwards"""
+        slots, capacity = self.slots, len(self.slots)
+        for i in range(self.head + index, self.head + self.count):
+            yield slots[i % capacity]
+
+    def bisect_x(self, x):
+        """Position of the first live entry whose x is greater than x"""
+        slots, capacity, head = self.slots, len(self.slots), self.head
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if slots[(head + mid) % capacity].x > x:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def first(self):
+        """Left-most live entry, or None when empty"""
+        return self.slots[self.head] if self.count else None
+
+    def push(self):
+        """Claim the next slot on the right and return it for the caller to fill"""
+        capacity = len(self.slots)
+        if self.count == capacity:
+            # Full: unroll into order and double the capacity
+            self.slots = (self.slots[self.head:] + self.slots[:self.head]
+                          + [self.factory() for _ in range(capacity)])
+            self.head = 0
+            capacity *= 2
+        slot = self.slots[(self.head + self.count) % capacity]
+        self.count += 1
+        return slot
+
+    def pop_left(self):
+        """Retire the left-most entry"""
+        self.head = (self.head + 1) % len(self.slots)
+        self.count -= 1
+        self.retired += 1
+
+    def clear(self, retired=0):
+        """Empty the ring; retired sets the id the next entry pushed will get"""
+        self.head = 0
+        self.count = 0
+        self.retired = retired
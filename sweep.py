@@ -0,0 +1,174 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+from collections import Counter
+
+from simulation import Simulation, DRONE_STATS, DRONES, GAMEPLAY_DEFAULTS
+from bots import PLAYERS, play
+
+# One representative code per branch of apply_weather_effects
+WEATHER_CODES = {
+    0: "clear",
+    2: "cloudy",
+    45: "fog",
+    61: "rain",
+    71: "snow",
+    95: "thunderstorm"
+}
+
+CONFIG_KEYS = ["drone", "gravity_scale", "flap_scale", "gap", "frequency",
+               "scroll_speed", "weather_code", "wind_speed", "player"]
+
+
+def parse_list(value, cast=float):
+    """Parse a comma-separated command line list"""
+    return [cast(item) for item in value.split(",") if item]
+
+
+def build_tasks(args):
+    """Expand the parameter grid into (key, config, seeds) work items"""
+    drones = DRONES if args.drones == "all" else parse_list(args.drones, str)
+    grid = itertools.product(drones, args.gravity_scales, args.flap_scales, args.gaps,
+                             args.frequencies, args.scroll_speeds, args.weather_codes,
+                             args.wind_speeds)
+    tasks = []
+    for values in grid:
+        config = dict(zip(CONFIG_KEYS, values), player=args.player)
+        for start in range(0, args.episodes, args.chunk):
+            seeds = list(range(args.seed + start, args.seed + min(start + args.chunk, args.episodes)))
+            # A work item is only reusable for the same seeds and tick cap
+            key = json.dumps([config, seeds[0], seeds[-1], args.max_ticks], sort_keys=True)
+            tasks.append((key, config, seeds, args.max_ticks))
+    return tasks
+
+
+def run_task(task):
+    """Play every seed of one grid point and return the per-episode results"""
+    key, config, seeds, max_ticks = task
+    drone = config["drone"]
+    drone_stats = dict(DRONE_STATS)
+    drone_stats[drone] = dict(DRONE_STATS[drone],
+                              gravity=DRONE_STATS[drone]["gravity"] * config["gravity_scale"],
+                              flap=DRONE_STATS[drone]["flap"] * config["flap_scale"])
+    tuning = {
+        "OBSTACLE_GAP": config["gap"],
+        "OBSTACLE_FREQUENCY": config["frequency"],
+        "SCROLL_SPEED": config["scroll_speed"]
+    }
+    weather = {
+        "temperature": 20,
+        "wind_speed": config["wind_speed"],
+        "weather_code": config["weather_code"]
+    }
+
+    player = PLAYERS[config["player"]]()
+    sim = Simulation(drone=drone, weather=weather, tuning=tuning, drone_stats=drone_stats)
+    episodes = []
+    for seed in seeds:
+        sim.reset(seed)
+        score = play(sim, player, max_ticks)
+        episodes.append([score, sim.tick, sim.game_over])
+    return {"key": key, "config": config, "episodes": episodes}
+
+
+def load_results(path):
+    """Read streamed results, ignoring a torn final line from a killed run"""
+    results = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                results[record["key"]] = record
+    return results
+
+
+def write_tables(results, out_dir, max_ticks, bucket_seconds):
+    """Aggregate episodes per config into survival-curve and score tables"""
+    by_config = {}
+    for record in results.values():
+        config_key = tuple(record["config"][k] for k in CONFIG_KEYS)
+        by_config.setdefault(config_key, []).extend(record["episodes"])
+
+    bucket = int(bucket_seconds * Simulation.TICK_RATE)
+    with open(os.path.join(out_dir, "survival.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(CONFIG_KEYS + ["seconds", "alive_fraction", "episodes"])
+        for config_key, episodes in sorted(by_config.items()):
+            for tick in range(0, max_ticks + 1, bucket):
+                # Episodes cut off by max_ticks count as alive until the end
+                alive = sum(1 for score, ticks, crashed in episodes
+                            if ticks > tick or not crashed)
+                writer.writerow(list(config_key) + [tick / Simulation.TICK_RATE,
+                                                    round(alive / len(episodes), 4),
+                                                    len(episodes)])
+
+    with open(os.path.join(out_dir, "scores.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(CONFIG_KEYS + ["score", "count", "fraction"])
+        for config_key, episodes in sorted(by_config.items()):
+            counts = Counter(score for score, ticks, crashed in episodes)
+            for score, count in sorted(counts.items()):
+                writer.writerow(list(config_key) + [score, count,
+                                                    round(count / len(episodes), 4)])
+
+    return by_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless difficulty sweep for FlightForge")
+    parser.add_argument("--out", default="sweep_results", help="output directory")
+    parser.add_argument("--player", choices=sorted(PLAYERS), default="bot")
+    parser.add_argument("--episodes", type=int, default=100, help="episodes per grid point")
+    parser.add_argument("--chunk", type=int, default=25, help="episodes per work item")
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    parser.add_argument("--max-ticks", type=int, default=Simulation.TICK_RATE * 300)
+    parser.add_argument("--bucket-seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--drones", default="all", help="comma-separated drone names")
+    parser.add_argument("--gravity-scales", type=parse_list, default=[1.0])
+    parser.add_argument("--flap-scales", type=parse_list, default=[1.0])
+    parser.add_argument("--gaps", type=lambda v: parse_list(v, int),
+                        default=[GAMEPLAY_DEFAULTS["OBSTACLE_GAP"]])
+    parser.add_argument("--frequencies", type=parse_list,
+                        default=[GAMEPLAY_DEFAULTS["OBSTACLE_FREQUENCY"]])
+    parser.add_argument("--scroll-speeds", type=parse_list,
+                        default=[GAMEPLAY_DEFAULTS["SCROLL_SPEED"]])
+    parser.add_argument("--weather-codes", type=lambda v: parse_list(v, int),
+                        default=list(WEATHER_CODES))
+    parser.add_argument("--wind-speeds", type=parse_list, default=[5.0])
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    results_path = os.path.join(args.out, "results.jsonl")
+    all_tasks = build_tasks(args)
+
+    # Resume: skip work items already streamed to disk. The file may hold
+    # other grids swept into the same directory; only this grid is tabulated.
+    wanted = {task[0] for task in all_tasks}
+    results = {key: record for key, record in load_results(results_path).items() if key in wanted}
+    tasks = [task for task in all_tasks if task[0] not in results]
+    print(f"{len(results)} work items done, {len(tasks)} to run on {args.workers} workers")
+
+    with open(results_path, "a") as file, multiprocessing.Pool(args.workers) as pool:
+        for done, record in enumerate(pool.imap_unordered(run_task, tasks), 1):
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            results[record["key"]] = record
+            if done % 50 == 0 or done == len(tasks):
+                print(f"{done}/{len(tasks)} work items")
+
+    by_config = write_tables(results, args.out, args.max_ticks, args.bucket_seconds)
+    for config_key, episodes in sorted(by_config.items()):
+        scores = sorted(score for score, ticks, crashed in episodes)
+        label = ", ".join(f"{k}={v}" for k, v in zip(CONFIG_KEYS, config_key))
+        print(f"{label}: mean {sum(scores) / len(scores):.1f}, median {scores[len(scores) // 2]}")
+
+
+if __name__ == "__main__":
+    main()
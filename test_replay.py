@@ -0,0 +1,42 @@
+import pytest
+
+from bots import BeamPilot, GapBot, play
+from replay import Recorder, Replay
+from simulation import Simulation
+
+STORM = {"temperature": 12, "wind_speed": 30, "weather_code": 95}
+FOG = {"temperature": 8, "wind_speed": 10, "weather_code": 45}
+CLEAR = {"temperature": 20, "wind_speed": 5, "weather_code": 0}
+
+
+def test_beam_pilot_replay_with_weather_changes_verifies():
+    # The pilot's lookahead runs past the end of each transition, so the
+    # transition state must survive its snapshot()/restore() rewinds
+    for seed in (1, 2, 3):
+        sim = Simulation(seed=seed, weather=CLEAR)
+        recorder = Recorder(sim)
+        pilot = BeamPilot()
+        for weather in (STORM, FOG, CLEAR, STORM):
+            play(sim, pilot, sim.tick + 400)
+            sim.apply_weather(weather, 180)
+        play(sim, pilot, sim.tick + 400)
+        data = recorder.finish()
+        assert Replay(data).verify().score == sim.score
+
+
+def test_replay_after_reset_without_seed_verifies():
+    # reset() with no seed draws the next course seed from the RNG
+    sim = Simulation(seed=5, weather=CLEAR)
+    play(sim, GapBot(), 600)
+    sim.reset()
+    recorder = Recorder(sim)
+    play(sim, GapBot(), 2000)
+    data = recorder.finish()
+    assert Replay(data).verify().score == sim.score
+
+
+def test_recorder_rejects_a_game_in_progress():
+    sim = Simulation(seed=5, weather=CLEAR)
+    sim.step()
+    with pytest.raises(ValueError):
+        Recorder(sim)
@@ -0,0 +1,255 @@
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+from simulation import DEFAULT_WEATHER, warm_weather
+
+WEATHER_API = "https://api.open-meteo.com/v1/forecast"
+NEW_YORK = ("New York", 40.71, -74.01)
+
+
+def parse_current_weather(data):
+    """Extract the fields the game uses from an Open-Meteo response"""
+    return {
+        "temperature": data["current_weather"]["temperature"],
+        "wind_speed": data["current_weather"]["windspeed"],
+        "weather_code": data["current_weather"]["weathercode"]
+    }
+
+
+def weather_query(locations):
+    """Query string for one request covering every (name, lat, long) location"""
+    return urllib.parse.urlencode({
+        "latitude": ",".join(str(lat) for name, lat, lon in locations),
+        "longitude": ",".join(str(lon) for name, lat, lon in locations),
+        "current_weather": "true"
+    }, safe=",")
+
+
+class WeatherCache:
+    """On-disk weather cache keyed by lat/long with a time-to-live"""
+
+    def __init__(self, path="weather_cache.json", ttl=30 * 60):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def key(self, latitude, longitude):
+        return f"{latitude:.2f},{longitude:.2f}"
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, latitude, longitude, allow_stale=False):
+        """Return cached conditions, or None if missing (or expired unless allow_stale)"""
+        with self.lock:
+            entry = self.load().get(self.key(latitude, longitude))
+        if not entry:
+            return None
+        if not allow_stale and time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["conditions"]
+
+    def put_many(self, items):
+        """Store (latitude, longitude, conditions) items, replacing the file atomically"""
+        with self.lock:
+            entries = self.load()
+            now = time.time()
+            for latitude, longitude, conditions in items:
+                entries[self.key(latitude, longitude)] = {
+                    "fetched_at": now,
+                    "conditions": conditions
+                }
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w") as file:
+                    json.dump(entries, file)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error writing weather cache: {e}")
+
+    def put(self, latitude, longitude, conditions):
+        self.put_many([(latitude, longitude, conditions)])
+
+
+class WeatherProvider:
+    """Non-blocking weather source for one or more locations
+
+    initial_conditions() returns cached (possibly stale) or default weather
+    immediately. start() runs a background thread that fetches every
+    location missing from the cache or older than its TTL in a single
+    batched request over a reused connection. With a refresh_interval it
+    then refetches every location each refresh_interval seconds, however
+    fresh the cache is; with None it stops after the first fetch. It also builds
+    the gust tables for what it fetched, so applying them costs no frame. poll() hands the
+    frame loop new conditions for the active location, either because fresh
+    data arrived or because rotation_interval seconds passed and the next
+    location became active.
+    """
+
+    def __init__(self, locations=None, refresh_interval=None, rotation_interval=None,
+                 cache=None, base_url=WEATHER_API, timeout=5):
+        self.locations = list(locations) if locations else [NEW_YORK]
+        self.refresh_interval = refresh_interval
+        self.rotation_interval = rotation_interval
+        self.cache = cache if cache is not None else WeatherCache()
+        self.base_url = base_url
+        self.timeout = timeout
+
+        self.results = queue.Queue()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.connection = None
+
+        # Latest known conditions per location name (frame thread only)
+        self.conditions = {}
+        for name, lat, lon in self.locations:
+            cached = self.cache.get(lat, lon, allow_stale=True)
+            if cached:
+                self.conditions[name] = cached
+        self.active = 0
+        self.last_rotation = time.monotonic()
+
+    @property
+    def active_location(self):
+        return self.locations[self.active][0]
+
+    def initial_conditions(self):
+        """Best weather available for the active location without touching the network"""
+        return self.conditions.get(self.active_location) or dict(DEFAULT_WEATHER)
+
+    def start(self):
+        """Start the background fetch/refresh thread"""
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the refresh thread, waiting up to timeout seconds for an in-flight fetch"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _refresh_loop(self):
+        # Cached conditions of other locations become active by rotation
+        for conditions in list(self.conditions.values()):
+            warm_weather(conditions)
+        refreshing = False
+        while not self.stop_event.is_set():
+            if refreshing:
+                stale = self.locations
+            else:
+                stale = [loc for loc in self.locations if self.cache.get(loc[1], loc[2]) is None]
+            if stale:
+                try:
+                    fetched = self.fetch_many(stale)
+                except Exception as e:
+                    print(f"Error fetching weather data: {e}")
+                else:
+                    self.cache.put_many((lat, lon, conditions)
+                                        for (name, lat, lon), conditions in zip(stale, fetched))
+                    # Gust tables are built here rather than on the frame that applies them
+                    for conditions in fetched:
+                        warm_weather(conditions)
+                    self.results.put({loc[0]: c for loc, c in zip(stale, fetched)})
+            if self.refresh_interval is None:
+                break
+            self.stop_event.wait(self.refresh_interval)
+            refreshing = True
+        self._close_connection()
+
+    def fetch_many(self, locations):
+        """Fetch conditions for every location with one request"""
+        url = urllib.parse.urlsplit(self.base_url)
+        path = f"{url.path or '/'}?{weather_query(locations)}"
+        data = json.loads(self._get(url, path).decode())
+
+        # Open-Meteo returns a list for several locations, an object for one
+        if isinstance(data, dict):
+            data = [data]
+        return [parse_current_weather(item) for item in data]
+
+    def _get(self, url, path):
+        """GET over a kept-alive connection, reconnecting once if it went stale"""
+        import http.client  # imported here, on the fetch thread, to keep it off startup
+
+        for attempt in range(2):
+            if self.connection is None:
+                connection_class = (http.client.HTTPSConnection if url.scheme == "https"
+                                    else http.client.HTTPConnection)
+                self.connection = connection_class(url.hostname, url.port, timeout=self.timeout)
+            try:
+                self.connection.request("GET", path)
+                response = self.connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                self._close_connection()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                self._close_connection()
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status}")
+            return body
+
+    def _close_connection(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def poll(self):
+        """Return new conditions for the active location, or None if unchanged"""
+        changed = False
+        try:
+            while True:
+                updates = self.results.get_nowait()
+                self.conditions.update(updates)
+                changed = changed or self.active_location in updates
+        except queue.Empty:
+            pass
+
+        # Rotate to the next location we have conditions for
+        now = time.monotonic()
+        if self.rotation_interval and now - self.last_rotation >= self.rotation_interval:
+            self.last_rotation = now
+            for offset in range(1, len(self.locations)):
+                index = (self.active + offset) % len(self.locations)
+                if self.locations[index][0] in self.conditions:
+                    self.active = index
+                    changed = True
+                    break
+
+        return self.conditions.get(self.active_location) if changed else None
+
+
+class FixedWeather:
+    """Weather provider that always reports the same conditions
+
+    Drop-in for WeatherProvider that never touches the network or the disk
+    cache, for benchmarks and offline play.
+    """
+
+    def __init__(self, conditions=None, name="Fixed"):
+        self.conditions = dict(conditions or DEFAULT_WEATHER)
+        self.active_location = name
+
+    def initial_conditions(self):
+        return dict(self.conditions)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def poll(self):
+        return None
@@ -0,0 +1,86 @@
+import random
+from array import array
+from functools import lru_cache
+
+
+class WindField:
+    """Precomputed gusts over time and altitude for one gust profile
+
+    x holds horizontal gusts (px/tick added to the drift) and y vertical
+    ones (px/tick^2 added to the drone's velocity), both flat tables of
+    BANDS altitude bands by PERIOD ticks. Each band reads the same tileable
+    noise with its own phase, so gust fronts reach altitudes at different
+    times, and gusts grow stronger towards the top of the screen. The
+    tables wrap every PERIOD ticks without a seam, so sampling is one
+    index: band * PERIOD + (tick + offset) % PERIOD, where each run's seed
+    picks its own offset.
+    """
+
+    PERIOD = 2048  # ticks, about 34 s
+    BANDS = 8
+    OCTAVES = 3
+
+    def __init__(self, force, lift, gust_ticks):
+        rng = random.Random(f"wind/{force}/{lift}/{gust_ticks}")
+        self.x = self.table(rng, force, gust_ticks)
+        self.y = self.table(rng, lift, gust_ticks)
+
+    def table(self, rng, amplitude, gust_ticks):
+        noise = tileable_noise(rng, self.PERIOD, gust_ticks, self.OCTAVES)
+        period, doubled = self.PERIOD, noise + noise
+        values = array("d")
+        for band in range(self.BANDS):
+            # Band 0 is the top of the screen, where gusts are strongest
+            gain = amplitude * (1.4 - 0.8 * band / (self.BANDS - 1))
+            phase = rng.randrange(period)
+            values.extend([gain * value for value in doubled[phase:phase + period]])
+        return values
+
+    @classmethod
+    def offset(cls, seed):
+        """Where in the tables a run with this seed starts"""
+        return random.Random(seed).randrange(cls.PERIOD)
+
+    @classmethod
+    def band(cls, y, height):
+        """Altitude band of screen height y"""
+        band = int(y * cls.BANDS / height)
+        return 0 if band < 0 else cls.BANDS - 1 if band >= cls.BANDS else band
+
+
+def tileable_noise(rng, length, cell, octaves):
+    """Smooth value noise in [-1, 1] that repeats every length samples
+
+    Octaves of random lattice values, eased between; each octave has half
+    the cell size and half the weight of the one before. Lattices wrap, so
+    the last sample flows into the first.
+    """
+    values = [0.0] * length
+    weight, total = 1.0, 0.0
+    for octave in range(octaves):
+        cells = max(1, round(length / cell))
+        lattice = [rng.uniform(-1, 1) for _ in range(cells)]
+        span = length / cells
+        for t in range(length):
+            u = t / span
+            i = int(u)
+            f = u - i
+            f = f * f * (3 - 2 * f)
+            a = lattice[i % cells]
+            values[t] += weight * (a + (lattice[(i + 1) % cells] - a) * f)
+        total += weight
+        weight *= 0.5
+        cell = max(1, cell // 2)
+    return [value / total for value in values]
+
+
+@lru_cache(maxsize=16)
+def wind_field(force, lift, gust_ticks):
+    """Shared WindField for a gust profile, or None when there are no gusts
+
+    Tables take about 15 ms to build and are never modified, so they are
+    built once per profile and shared by every simulation in the process.
+    """
+    if not force and not lift:
+        return None
+    return WindField(force, lift, gust_ticks)